@@ -1,27 +1,166 @@
-import gurobipy as gp
-from offgridoptimizer import Product, Grid, Project, OffGridOptimizer
+"""
+Headless batch solver.
+
+    python . configs/*.json --hours year --time-limit 600 --mip-gap 0.01 --threads 4 --output-dir results
 
+Every config is validated with load_and_validate and solved on its own. For each one a
+<config>.json summary (status, objective, gap, selected products and costs) is written next to the
+hourly dispatch, which goes into the same JSON or into <config>.parquet. The widget UI is never
+imported, so the solver starts quickly on batch nodes. With --cache-dir, configs solved before with
+the same hours and parameters are answered from the solution cache.
+"""
 import argparse
+import glob
+import json
+import pathlib
+import sys
 
+import gurobipy as gp
+from jsonschema import ValidationError
 
-def main(config_path):
-    import json
-    with open(config_path) as fp:
-        config = json.load(fp)
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.cache import SolutionCache
+from offgridoptimizer.heuristic import GreedyStart, RoundedRelaxation
+from offgridoptimizer.telemetry import SolveTelemetry
+from offgridoptimizer.product import StorageProduct
+from offgridoptimizer.timeindex import HOUR_SETS
 
-    demand = config["demand"]
-    budget = config["budget"]
-    products = config["products"]
-    grid = config["grid"]
+STATUS_NAMES = {getattr(gp.GRB.Status, name): name for name in dir(gp.GRB.Status) if name.isupper()}
+FORMATS = ['json', 'parquet']
+TELEMETRY_FORMATS = ['jsonl', 'prom']
 
-    # eco = OffGridOptimizer(model_name="model", demand=demand, budget=budget, products=products, grid=grid)
-    # eco.optimize()
-    # eco.print_results()
 
+def config_paths(patterns):
+    """
+    Paths of every pattern, globs are expanded here as well in case the shell did not
+    """
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise FileNotFoundError(f'No config matches {pattern}')
+        paths.extend(matches)
 
-if __name__ == '__main__':
+    return [pathlib.Path(path) for path in paths]
+
+
+def solve(config_path, hours, time_limit=None, mip_gap=None, threads=None, telemetry=None, heuristic_start=False,
+          relax=False, **kwargs):
+    """
+    :return: (summary dict, results_df or None when no solution was found)
+    """
+    config = load_and_validate(config_path)
+    project = Project.project_from_config(config, hours=hours, validate=False, **kwargs)
+    model = project.model
+    for name, value in [('TimeLimit', time_limit), ('MIPGap', mip_gap), ('Threads', threads)]:
+        if value is not None:
+            model.setParam(name, value)
+
+    start = GreedyStart(project) if heuristic_start else None
+    if start is not None:
+        start.apply()
+    rounded = RoundedRelaxation(project) if relax else None
+    if rounded is None:
+        project.optimize(telemetry=telemetry)
+    elif telemetry is not None:
+        telemetry.finish(project)
+
+    summary = {'config': str(config_path),
+               'location': config['location'],
+               'hours': len(project.hours),
+               'status': STATUS_NAMES.get(project.status, project.status),
+               'runtime': 0.0 if project.cached else model.Runtime,
+               'cached': project.cached}
+    if rounded is not None:
+        summary['relaxation'] = {'lower_bound': rounded.lower_bound, 'gap': rounded.gap, 'seconds': rounded.seconds}
+    if start is not None:
+        summary['heuristic_start'] = {'objective': start.objective, 'seconds': start.seconds}
+    if project.catalog is not None:
+        summary['catalog_dropped'] = project.catalog.dropped
+    if project.profiler is not None:
+        summary['build_profile'] = project.profiler.rows()
+        print(f'{config_path} build profile:\n{project.profiler.report()}')
+    if not project.cached and model.SolCount == 0:
+        return summary, None
+
+    solution = project.solution()
+    summary.update({'objective': solution.objective,
+                    'mip_gap': solution.mip_gap,
+                    'selected_products': dict(project.selected_products()),
+                    'costs': dict(project.costs())})
+    return summary, project.results_df()
+
+
+def write_results(summary, df, output_dir, name, output_format):
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if df is not None and output_format == 'parquet':
+        df.to_parquet(output_dir / f'{name}.parquet', index=False)
+    elif df is not None:
+        df = df.assign(date=df['date'].dt.strftime('%Y-%m-%d %H:%M'))
+        summary = dict(summary, dispatch=df.to_dict(orient='list'))
+
+    with open(output_dir / f'{name}.json', 'w') as fp:
+        json.dump(summary, fp, indent=2, default=float)
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser('Off-Grid Optimizer')
-    parser.add_argument('config_path', type=str)
-    args = parser.parse_args()
+    parser.add_argument('config_paths', type=str, nargs='+', help='config files or glob patterns')
+    parser.add_argument('--hours', type=str, default='year', choices=list(HOUR_SETS))
+    parser.add_argument('--time-limit', type=float, default=None, help='seconds per config')
+    parser.add_argument('--mip-gap', type=float, default=None, help='relative MIP gap to stop at')
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--formulation', type=str, default=StorageProduct.STATE_OF_CHARGE,
+                        choices=StorageProduct.FORMULATIONS)
+    parser.add_argument('--build', type=str, default=None, choices=Project.BUILDS,
+                        help='defaults to matrix for the soc formulation and to expression otherwise')
+    parser.add_argument('--format', type=str, default='json', choices=FORMATS,
+                        help='format of the hourly dispatch, the summary is always JSON')
+    parser.add_argument('--output-dir', type=str, default='results')
+    parser.add_argument('--telemetry', type=str, default=None, choices=TELEMETRY_FORMATS,
+                        help='also write solver progress and statistics as <config>.jsonl or <config>.prom')
+    parser.add_argument('--profile', action='store_true',
+                        help='time each model build phase and count what it adds, reported in the summary')
+    parser.add_argument('--heuristic-start', action='store_true',
+                        help='start the solve from a greedy sizing and its dispatch')
+    parser.add_argument('--relax', action='store_true',
+                        help='solve the LP relaxation and round it, the summary reports its bound and gap')
+    parser.add_argument('--presolve-catalog', action='store_true',
+                        help='leave dominated and unaffordable products out of the model, listed in the summary')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                        help='reuse solutions of configs solved before, kept in this directory')
+    args = parser.parse_args(argv)
+    build = args.build or Project.default_build(args.formulation)
+    if build == Project.MATRIX_BUILD and args.formulation != StorageProduct.STATE_OF_CHARGE:
+        parser.error(f'--build {build} requires --formulation {StorageProduct.STATE_OF_CHARGE}')
+
+    cache = SolutionCache(pathlib.Path(args.cache_dir)) if args.cache_dir else None
 
-    main(args.config_path)
+    failed = 0
+    output_dir = pathlib.Path(args.output_dir)
+    for config_path in config_paths(args.config_paths):
+        telemetry = SolveTelemetry(labels={'config': config_path.stem, 'hours': args.hours}) \
+            if args.telemetry else None
+        try:
+            summary, df = solve(config_path, HOUR_SETS[args.hours](), time_limit=args.time_limit,
+                                mip_gap=args.mip_gap, threads=args.threads, telemetry=telemetry,
+                                heuristic_start=args.heuristic_start, relax=args.relax,
+                                storage_formulation=args.formulation, build=build, cache=cache,
+                                profile_build=args.profile, presolve_catalog=args.presolve_catalog)
+        except (ValidationError, json.JSONDecodeError, gp.GurobiError, OSError, ValueError) as e:
+            print(f'{config_path}: {e}', file=sys.stderr)
+            failed += 1
+            continue
+
+        write_results(summary, df, output_dir, config_path.stem, args.format)
+        if telemetry is not None:
+            telemetry.write(output_dir / f'{config_path.stem}.{args.telemetry}')
+        if df is None:
+            failed += 1
+        print(f'{config_path}: {summary["status"]} {summary.get("objective")}')
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
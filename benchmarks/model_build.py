@@ -0,0 +1,63 @@
+"""
+Compare model build time and size of the storage formulations and model builds as the horizon grows.
+
+    python benchmarks/model_build.py --config configs/medium_budget.json --hours 24 168 720 2190
+
+The cumulative formulation grows quadratically with the number of hours while the
+state-of-charge formulation grows linearly, which shows up as a constant nonzeros-per-hour column.
+The matrix build produces the same model as the state-of-charge expression build, only faster.
+"""
+import argparse
+import pathlib
+import sys
+import time
+
+from tabulate import tabulate
+
+sys.path.insert(0, str(pathlib.Path(__file__).parent.parent))
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.product import StorageProduct
+
+
+def build(config, hours, storage_formulation, model_build):
+    start = time.perf_counter()
+    project = Project.project_from_config(config, hours=hours, validate=False,
+                                          storage_formulation=storage_formulation, build=model_build)
+    project.model.update()
+    elapsed = time.perf_counter() - start
+    return elapsed, project.model.NumVars, project.model.NumConstrs, project.model.NumNZs
+
+
+def main(config_path, horizons, formulations, model_builds):
+    config = load_and_validate(config_path)
+    # load the location data once so it is not counted in the first build
+    Project.project_from_config(config, hours=[], validate=False)
+
+    rows = []
+    for storage_formulation in formulations:
+        for model_build in model_builds:
+            if model_build == Project.MATRIX_BUILD and storage_formulation != StorageProduct.STATE_OF_CHARGE:
+                continue
+
+            for horizon in horizons:
+                elapsed, num_vars, num_constrs, num_nzs = build(config, list(range(horizon)),
+                                                                storage_formulation, model_build)
+                rows.append((storage_formulation, model_build, horizon, round(elapsed, 3), num_vars, num_constrs,
+                             num_nzs, round(num_nzs / horizon, 1), round(1000 * elapsed / horizon, 3)))
+
+    print(tabulate(rows, headers=['Formulation', 'Build', 'Hours', 'Build (s)', 'Vars', 'Constrs', 'Nonzeros',
+                                  'Nonzeros / Hour', 'Build ms / Hour']))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser('Model build benchmark')
+    parser.add_argument('--config', type=str, default=str(pathlib.Path(__file__).parent.parent /
+                                                          'configs' / 'medium_budget.json'))
+    parser.add_argument('--hours', type=int, nargs='+', default=[24, 168, 720, 2190])
+    parser.add_argument('--formulations', type=str, nargs='+', default=StorageProduct.FORMULATIONS,
+                        choices=StorageProduct.FORMULATIONS)
+    parser.add_argument('--builds', type=str, nargs='+', default=Project.BUILDS, choices=Project.BUILDS)
+    args = parser.parse_args()
+
+    main(args.config, args.hours, args.formulations, args.builds)
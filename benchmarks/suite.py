@@ -0,0 +1,241 @@
+"""
+Benchmark suite: data load, model build, solve and results extraction over configs, locations and horizons.
+
+    python benchmarks/suite.py --hours one_day_each_month one_month --time-limit 300
+    python benchmarks/suite.py --save-baseline        # record the current numbers as the baseline
+    python benchmarks/suite.py --configs medium_budget --locations sedona_az --hours year
+    python benchmarks/suite.py --configs low_budget --heuristic-start  # solve from a greedy MIP start
+
+Every case is a shipped config solved at one of the locations over one hour set. Cases run one by one,
+each in a fresh process, so data loading starts cold and the peak RSS is that case's own. The numbers
+are compared with the stored baseline and a case is flagged when a stage got slower than the time
+tolerance allows, its model grew, or its peak RSS grew beyond the memory tolerance. Besides the stages
+every case records how long the solve took to its first incumbent and to the target gap, counted from
+the start of the solve including the greedy MIP start when one is built, see heuristic.GreedyStart.
+
+Timings only compare on the machine they were taken on, so no baseline is shipped: record one with
+--save-baseline first. The exit code is 1 when anything regressed and 2 when a case has no baseline
+to compare with, so the suite can gate a CI job.
+"""
+import argparse
+import json
+import multiprocessing
+import pathlib
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tabulate import tabulate
+
+ROOT = pathlib.Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.heuristic import GreedyStart
+from offgridoptimizer.product import StorageProduct
+from offgridoptimizer.registry import location_profile
+from offgridoptimizer.telemetry import SolveTelemetry
+from offgridoptimizer.timeindex import HOUR_SETS
+
+CONFIGS = sorted(path.stem for path in (ROOT / 'configs').glob('*.json'))
+LOCATIONS = sorted(path.stem[len('demand_'):] for path in (ROOT / 'data' / 'demand_data').glob('demand_*.csv'))
+HORIZONS = ['one_day_each_month', 'one_month', 'every_other_hour', 'year']
+BASELINE = pathlib.Path(__file__).parent / 'baseline.json'
+STAGES = ['load_s', 'build_s', 'solve_s', 'extract_s']
+# progress of the solve, None when it never got there: the greedy start, first incumbent and target gap
+SOLVE_TIMES = ['heuristic_s', 'first_incumbent_s', 'gap_s']
+COLUMNS = ['case', 'status'] + STAGES + SOLVE_TIMES + ['vars', 'constrs', 'nonzeros', 'nodes', 'objective', 'peak_rss_mb']
+
+
+def case_id(config_name, location, horizon):
+    return f'{config_name}/{location}/{horizon}'
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def run_case(job):
+    """
+    Run one case, in a fresh worker process
+
+    :param job: (config name, location, horizon, time limit, threads, Project kwargs, target gap,
+        whether to solve from a greedy MIP start)
+    :return: dict with the COLUMNS of the case
+    """
+    config_name, location, horizon, time_limit, threads, kwargs, target_gap, heuristic_start = job
+    row = {'case': case_id(config_name, location, horizon)}
+    try:
+        config = load_and_validate(ROOT / 'configs' / f'{config_name}.json')
+        config['location'] = location
+        hours = HOUR_SETS[horizon]()
+
+        start = time.perf_counter()
+        location_profile(location)
+        row['load_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        project = Project.project_from_config(config, hours=hours, validate=False, **kwargs)
+        project.model.update()
+        row['build_s'] = time.perf_counter() - start
+        model = project.model
+        row.update(vars=model.NumVars, constrs=model.NumConstrs, nonzeros=model.NumNZs)
+
+        model.setParam('OutputFlag', 0)
+        model.setParam('TimeLimit', time_limit)
+        if threads:
+            model.setParam('Threads', threads)
+        start = time.perf_counter()
+        heuristic_s = 0.0
+        if heuristic_start:
+            GreedyStart(project).apply()
+            heuristic_s = row['heuristic_s'] = time.perf_counter() - start
+        telemetry = SolveTelemetry()
+        project.optimize(telemetry=telemetry)
+        row['solve_s'] = time.perf_counter() - start
+        row['status'] = model.Status
+        row['nodes'] = model.NodeCount
+        row.update(solve_times(telemetry, target_gap, heuristic_s))
+
+        if model.SolCount:
+            start = time.perf_counter()
+            project.costs()
+            project.selected_products()
+            project.results_df()
+            row['extract_s'] = time.perf_counter() - start
+            row['objective'] = model.ObjVal
+    except Exception as e:
+        row['status'] = f'error: {type(e).__name__}'
+        row['error'] = str(e)
+
+    row['peak_rss_mb'] = peak_rss_mb()
+    return row
+
+
+def solve_times(telemetry, target_gap, heuristic_s):
+    """
+    :return: seconds to the first incumbent and to target_gap, counted from before heuristic_s
+    """
+    times = {}
+    events = [event for event in telemetry.events if event['event'] != 'final']
+    incumbents = [event['time'] for event in events if event['incumbent'] is not None]
+    if incumbents:
+        times['first_incumbent_s'] = heuristic_s + incumbents[0]
+
+    closed = [event['time'] for event in events if event['gap'] is not None and event['gap'] <= target_gap]
+    final = telemetry.final
+    if not closed and final.get('MIPGap', float('inf')) <= target_gap:
+        closed = [final['Runtime']]  # the gap was closed between two progress events
+    if closed:
+        times['gap_s'] = heuristic_s + closed[0]
+
+    return times
+
+
+def regressions(row, baseline, time_tolerance, memory_tolerance, min_seconds=0.05):
+    """
+    :return: list of descriptions of how row regressed against its baseline row
+    """
+    found = []
+    for stage in STAGES + SOLVE_TIMES:
+        old, new = baseline.get(stage), row.get(stage)
+        if old is not None and new is not None and new > max(old, min_seconds) * (1 + time_tolerance):
+            found.append(f'{stage} {old:.3f}s -> {new:.3f}s')
+
+    for size in ['vars', 'constrs', 'nonzeros']:
+        old, new = baseline.get(size), row.get(size)
+        if old is not None and new is not None and new > old:
+            found.append(f'{size} {old} -> {new}')
+
+    old, new = baseline.get('peak_rss_mb'), row.get('peak_rss_mb')
+    if old is not None and new is not None and new > old * (1 + memory_tolerance):
+        found.append(f'peak_rss_mb {old:.0f} -> {new:.0f}')
+
+    if baseline.get('status') == 2 and row.get('status') != 2:
+        found.append(f'status 2 -> {row.get("status")}')
+
+    return found
+
+
+def compare(rows, baseline, time_tolerance, memory_tolerance):
+    """
+    :return: ({case: regressions} of the cases that regressed, cases missing from the baseline)
+    """
+    flagged = {row['case']: regressions(row, baseline[row['case']], time_tolerance, memory_tolerance)
+               for row in rows if row['case'] in baseline}
+    missing = [row['case'] for row in rows if row['case'] not in baseline]
+    return {case: found for case, found in flagged.items() if found}, missing
+
+
+def load_baseline(path):
+    try:
+        with open(path) as fp:
+            return json.load(fp)
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser('Off-Grid Optimizer benchmark suite')
+    parser.add_argument('--configs', type=str, nargs='+', default=CONFIGS, choices=CONFIGS)
+    parser.add_argument('--locations', type=str, nargs='+', default=LOCATIONS, choices=LOCATIONS)
+    parser.add_argument('--hours', type=str, nargs='+', default=HORIZONS, choices=list(HOUR_SETS))
+    parser.add_argument('--formulation', type=str, default=StorageProduct.STATE_OF_CHARGE,
+                        choices=StorageProduct.FORMULATIONS)
+    parser.add_argument('--build', type=str, default=None, choices=Project.BUILDS,
+                        help='defaults to matrix for the soc formulation and to expression otherwise')
+    parser.add_argument('--time-limit', type=float, default=600, help='seconds per solve')
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--target-gap', type=float, default=0.01, help='relative gap timed as gap_s')
+    parser.add_argument('--heuristic-start', action='store_true', help='solve from a greedy MIP start')
+    parser.add_argument('--baseline', type=str, default=str(BASELINE))
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the baseline')
+    parser.add_argument('--time-tolerance', type=float, default=0.25, help='allowed relative slowdown per stage')
+    parser.add_argument('--memory-tolerance', type=float, default=0.2, help='allowed relative peak RSS growth')
+    parser.add_argument('--output', type=str, default=None, help='also write every result row as JSON')
+    args = parser.parse_args(argv)
+    build = args.build or Project.default_build(args.formulation)
+    if build == Project.MATRIX_BUILD and args.formulation != StorageProduct.STATE_OF_CHARGE:
+        parser.error(f'--build {build} requires --formulation {StorageProduct.STATE_OF_CHARGE}')
+
+    kwargs = {'storage_formulation': args.formulation, 'build': build}
+    jobs = [(config_name, location, horizon, args.time_limit, args.threads, kwargs, args.target_gap,
+             args.heuristic_start)
+            for config_name in args.configs for location in args.locations for horizon in args.hours]
+
+    # one case per worker process, so every case loads its data cold and has its own peak RSS
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, max_tasks_per_child=1) as pool:
+        for row in pool.map(run_case, jobs):
+            print(f'{row["case"]}: {row.get("error", row.get("status"))}', file=sys.stderr)
+            rows.append(row)
+
+    baseline = load_baseline(args.baseline)
+    flagged, missing = compare(rows, baseline, args.time_tolerance, args.memory_tolerance)
+
+    print(tabulate([[row.get(column) for column in COLUMNS] for row in rows], headers=COLUMNS, floatfmt='.3f'))
+    for case, found in flagged.items():
+        print(f'REGRESSION {case}: {", ".join(found)}')
+    for case in missing:
+        print(f'NO BASELINE {case}: not in {args.baseline}, record it with --save-baseline')
+
+    if args.output:
+        with open(args.output, 'w') as fp:
+            json.dump(rows, fp, indent=2)
+
+    if args.save_baseline:
+        baseline.update({row['case']: row for row in rows})
+        with open(args.baseline, 'w') as fp:
+            json.dump(baseline, fp, indent=2, sort_keys=True)
+
+    if flagged:
+        return 1
+    return 2 if missing and not args.save_baseline else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Time-series aggregation: solve over k weighted representative days instead of the whole year.
+
+Each day of the year is described by its 24 hours of demand, solar efficiency, wind efficiency
+and grid price. Days are clustered with k-medoids and every cluster is represented by its medoid,
+an actual day of the data, weighted by the number of days in the cluster.
+"""
+import numpy as np
+
+from offgridoptimizer import HOURS_IN_DAY, HOURS_IN_YEAR
+from offgridoptimizer.product import StorageProduct
+from offgridoptimizer.project import Project
+from offgridoptimizer.registry import location_profile
+from offgridoptimizer.timeindex import HOURS
+
+DAYS_IN_YEAR = HOURS_IN_YEAR // HOURS_IN_DAY
+
+
+def daily_profiles(profile):
+    """
+    One row per day, 24 columns per series, each series scaled to [0, 1] so no series dominates the distance
+
+    :param profile: LocationProfile
+    :return: (DAYS_IN_YEAR, 4 * HOURS_IN_DAY) array
+    """
+    series = [profile.demand.hourly_demand, profile.efficiency.hourly_solar_capacity,
+              profile.efficiency.hourly_wind_capacity, profile.hourly_grid]
+    columns = []
+    for s in series:
+        values = s.take(HOURS)
+        spread = values.max() - values.min()
+        values = (values - values.min()) / spread if spread > 0 else np.zeros_like(values)
+        columns.append(values.reshape(DAYS_IN_YEAR, HOURS_IN_DAY))
+
+    return np.hstack(columns)
+
+
+def k_medoids(features, k, max_iter=100):
+    """
+    Partitioning around medoids with a deterministic greedy start
+
+    :param features: (n, m) array, one row per item
+    :param k: number of clusters
+    :return: (medoids, labels) medoid row indices and the cluster of every row
+    """
+    n = len(features)
+    if not 1 <= k <= n:
+        raise ValueError(f'Cannot pick {k} medoids from {n} items')
+
+    squared = (features ** 2).sum(axis=1)
+    distances = np.sqrt(np.maximum(squared[:, None] + squared[None, :] - 2 * features @ features.T, 0))
+
+    # greedy start: the most central item, then repeatedly the item that lowers the total distance the most
+    medoids = [int(np.argmin(distances.sum(axis=1)))]
+    while len(medoids) < k:
+        nearest = distances[:, medoids].min(axis=1)
+        gains = np.maximum(nearest[:, None] - distances, 0).sum(axis=0)
+        gains[medoids] = -1
+        medoids.append(int(np.argmax(gains)))
+
+    labels = np.argmin(distances[:, medoids], axis=1)
+    for _ in range(max_iter):
+        updated = []
+        for cluster in range(k):
+            members = np.flatnonzero(labels == cluster)
+            if not len(members):
+                # a medoid identical to another one loses every tie and keeps no members
+                updated.append(medoids[cluster])
+                continue
+            within = distances[np.ix_(members, members)].sum(axis=1)
+            updated.append(int(members[np.argmin(within)]))
+
+        if updated == medoids:
+            break
+
+        medoids = updated
+        labels = np.argmin(distances[:, medoids], axis=1)
+
+    return np.array(medoids), labels
+
+
+class RepresentativeDays:
+    def __init__(self, days, weights, labels):
+        self.days = days        # day of year of each representative day, in calendar order
+        self.weights = weights  # number of days of the year each representative day stands for
+        self.labels = labels    # index into days of the representative of every day of the year
+
+    @classmethod
+    def from_location(cls, location, k):
+        medoids, labels = k_medoids(daily_profiles(location_profile(location)), k)
+        order = np.argsort(medoids)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(k)
+        return RepresentativeDays(days=medoids[order], weights=np.bincount(labels, minlength=k)[order],
+                                  labels=rank[labels])
+
+    def hours(self):
+        return (self.days[:, None] * HOURS_IN_DAY + np.arange(HOURS_IN_DAY)[None, :]).ravel()
+
+    def hour_weights(self):
+        return np.repeat(self.weights, HOURS_IN_DAY).astype(float)
+
+
+def representative_project(config, k, validate=True, **kwargs):
+    """
+    Project over the k representative days of config's location, with grid costs and sales weighted
+    by the number of days each representative day stands for
+
+    :return: (Project, RepresentativeDays)
+    """
+    days = RepresentativeDays.from_location(config['location'], k)
+    project = Project.project_from_config(config, hours=days.hours(), validate=validate,
+                                          weights=days.hour_weights(), **kwargs)
+    return project, days
+
+
+def aggregation_error(config, k, reference_hours=HOURS, **kwargs):
+    """
+    Solve config over k representative days and over reference_hours (the full year by default)
+    and compare the two
+
+    :param kwargs: passed to both Projects, e.g. storage_formulation and build, which default to the
+        state-of-charge formulation and the matrix build, the cumulative formulation grows quadratically
+        with the hours and cannot solve a whole year
+    :return: dict of the objective and costs of both solves with the relative error of each
+    """
+    kwargs.setdefault('storage_formulation', StorageProduct.STATE_OF_CHARGE)
+    kwargs.setdefault('build', Project.MATRIX_BUILD)
+    aggregated, days = representative_project(config, k, **kwargs)
+    aggregated.optimize()
+    reference = Project.project_from_config(config, hours=reference_hours, validate=False, **kwargs)
+    reference.optimize()
+
+    def relative(value, reference_value):
+        return abs(value - reference_value) / abs(reference_value) if reference_value else abs(value)
+
+    costs = {label: (value, reference_value, relative(value, reference_value))
+             for (label, value), (_, reference_value) in zip(aggregated.costs(), reference.costs())}
+
+    return {'k': k,
+            'days': days.days.tolist(),
+            'hours': len(aggregated.hours),
+            'reference_hours': len(reference.hours),
+            'objective': aggregated.model.ObjVal,
+            'reference_objective': reference.model.ObjVal,
+            'relative_error': relative(aggregated.model.ObjVal, reference.model.ObjVal),
+            'costs': costs,
+            'runtime': aggregated.model.Runtime,
+            'reference_runtime': reference.model.Runtime}
@@ -0,0 +1,106 @@
+"""
+Background solves: build and optimize a Project on a worker thread, reporting progress and cancellable.
+
+Gurobi releases the interpreter lock while it optimizes, so a notebook kernel stays responsive during
+the solve. Progress is read in a Gurobi callback and handed to on_progress at most every `interval`
+seconds; cancel() terminates the solve, which then ends with the best incumbent found so far.
+
+    solve = BackgroundSolve(lambda: Project.project_from_config(config, hours=hours),
+                            on_progress=print, on_done=lambda project: print(project.costs()))
+    solve.start()
+    ...
+    solve.cancel()
+"""
+import threading
+import time
+
+import gurobipy as gp
+
+
+class Progress(dict):
+    """
+    One progress report: incumbent, bound, gap (relative, None until there is an incumbent) and elapsed seconds
+    """
+    @property
+    def text(self):
+        if self['incumbent'] is None:
+            return f"{self['elapsed']:.1f}s, bound {self['bound']:,.2f}, no incumbent yet"
+
+        return f"{self['elapsed']:.1f}s, incumbent {self['incumbent']:,.2f}, bound {self['bound']:,.2f}, " \
+               f"gap {100 * self['gap']:.2f}%"
+
+
+class BackgroundSolve:
+    def __init__(self, build, on_progress=None, on_done=None, on_error=None, interval=0.5):
+        """
+        :param build: function returning the Project to optimize, called on the worker thread
+        :param on_progress: called with a Progress while the solve runs
+        :param on_done: called with the Project once optimize returns, also after a cancel
+        :param on_error: called with the exception if building or solving failed
+        :param interval: least seconds between two progress reports
+        """
+        self.build = build
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.interval = interval
+        self.project = None
+        self.error = None
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.last_report = -float('inf')
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        """
+        Stop the solve, the Project keeps the best solution found so far
+        """
+        self.cancelled.set()
+        if self.project is not None:
+            self.project.model.terminate()
+
+    def join(self, timeout=None):
+        self.thread.join(timeout)
+        return self
+
+    @property
+    def running(self):
+        return self.thread.is_alive()
+
+    def run(self):
+        try:
+            self.project = self.build()
+            if not self.cancelled.is_set():
+                self.project.optimize(self.callback)
+        except Exception as e:
+            self.error = e
+            if self.on_error is not None:
+                self.on_error(e)
+            return
+
+        if self.on_done is not None:
+            self.on_done(self.project)
+
+    def callback(self, model, where):
+        if self.cancelled.is_set():
+            model.terminate()
+            return
+
+        if where != gp.GRB.Callback.MIP or self.on_progress is None:
+            return
+
+        elapsed = model.cbGet(gp.GRB.Callback.RUNTIME)
+        if elapsed - self.last_report < self.interval:
+            return
+
+        self.last_report = elapsed
+        incumbent = model.cbGet(gp.GRB.Callback.MIP_OBJBST)
+        bound = model.cbGet(gp.GRB.Callback.MIP_OBJBND)
+        if incumbent >= gp.GRB.INFINITY:
+            incumbent = gap = None
+        else:
+            gap = abs(incumbent - bound) / max(abs(incumbent), 1e-10)
+        self.on_progress(Progress(incumbent=incumbent, bound=bound, gap=gap, elapsed=elapsed))
@@ -0,0 +1,176 @@
+"""
+Benders decomposition: a sizing master MILP and one dispatch LP per period.
+
+The master holds the sizing decisions (product.x, product.y and grid_installed), their costs and budget
+constraints, plus one operating cost variable per period. Every iteration the master's sizing is fixed
+in each period's dispatch model, whose LP relaxation gives the period's operating cost and, through the
+reduced costs of the fixed sizing variables, an optimality cut for the master. A period that the sizing
+cannot serve returns a feasibility cut from the reduced costs of its minimum-violation relaxation.
+
+storage_installed is left to the periods: it carries no cost, so it can always be 1 and relaxing it
+is exact. The periods are solved independently, which makes three constraints hold per period rather
+than over the whole horizon: storage starts every period empty, revenue is capped by the period's grid
+cost and the grid usage big-M applies to each period's usage.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from offgridoptimizer.aggregation import RepresentativeDays
+from offgridoptimizer.config_schema import validate_config
+from offgridoptimizer.project import Project, Sizing
+from offgridoptimizer.timeindex import everyday_one_month
+
+import gurobipy as gp
+
+MONTHS = range(1, 13)
+
+
+def sizing_vars(project):
+    # the order the sizing is exchanged in between the master and the periods
+    return [p.y for p in project.products] + [p.x for p in project.products] + [project.grid.grid_installed]
+
+
+def sizing_from_values(values):
+    n = (len(values) - 1) // 2
+    return Sizing(units=list(values[:n]), opened=list(values[n:2 * n]), grid_installed=values[-1])
+
+
+def dispatch_cut(job):
+    """
+    Operating cost of one period for a fixed sizing, with its subgradient in the sizing
+
+    Runs in a worker process, so it only takes and returns plain values.
+
+    :param job: (config, hours, weights, sizing values, Project kwargs)
+    :return: (feasible, value, gradient) where value is the operating cost, or the total constraint
+             violation of an infeasible period, and gradient its reduced costs in the sizing values
+    """
+    config, hours, weights, values, kwargs = job
+    project = Project.project_from_config(config, hours=hours, validate=False, weights=weights, **kwargs)
+    project.fix_sizing(sizing_from_values(values))
+    project.model.setObjective(-project.total_revenue() + project.grid.artificial_total_grid_cost(),
+                               gp.GRB.MINIMIZE)
+    project.model.update()
+    indices = [v.index for v in sizing_vars(project)]
+
+    relaxed = project.model.relax()
+    relaxed.setParam('OutputFlag', 0)
+    relaxed.setParam('Threads', 1)
+    relaxed.optimize()
+    feasible = relaxed.Status == gp.GRB.OPTIMAL
+    if not feasible:
+        relaxed.feasRelaxS(0, False, False, True)
+        relaxed.optimize()
+
+    relaxed_vars = relaxed.getVars()
+    gradient = [relaxed_vars[i].RC for i in indices]
+    value = relaxed.ObjVal
+    relaxed.dispose()
+    project.model.dispose()
+    return feasible, value, gradient
+
+
+class Benders:
+    def __init__(self, config, periods, weights=None, processes=None, tolerance=1e-4, max_iterations=50,
+                 validate=True, **kwargs):
+        """
+        :param config: Project config, as for Project.project_from_config
+        :param periods: list of hour arrays, one dispatch LP each, e.g. the months of the year
+        :param weights: optional list of per-hour cost weights of each period
+        :param processes: worker processes solving the periods, defaults to every core, 0 solves in this process
+        :param tolerance: relative gap between the upper and lower bound to stop at
+        :param kwargs: passed to every period Project, e.g. storage_formulation and build
+        """
+        if validate:
+            validate_config(config)
+
+        self.config = config
+        self.periods = [np.asarray(hours, dtype=int) for hours in periods]
+        self.weights = weights if weights is not None else [None] * len(self.periods)
+        self.processes = os.cpu_count() if processes is None else processes
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.kwargs = kwargs
+
+        # the master is a Project over no hours: sizing variables, sizing constraints and sizing costs only
+        self.master = Project.project_from_config(config, hours=[], validate=False)
+        self.master.model.setParam('OutputFlag', 0)
+        self.theta = [self.master.model.addVar() for _ in self.periods]  # operating cost of each period
+        self.master.model.setObjective(self.sizing_cost() + gp.quicksum(self.theta), gp.GRB.MINIMIZE)
+
+        self.lower_bound = -gp.GRB.INFINITY
+        self.upper_bound = gp.GRB.INFINITY
+        self.sizing = None
+        self.history = []
+
+    @classmethod
+    def monthly(cls, config, **kwargs):
+        return Benders(config, [everyday_one_month(month) for month in MONTHS], **kwargs)
+
+    @classmethod
+    def from_representative_days(cls, config, k, **kwargs):
+        """
+        One period per representative day, weighted by the number of days it stands for
+        """
+        days = RepresentativeDays.from_location(config['location'], k)
+        hours = days.hours().reshape(k, -1)
+        weights = days.hour_weights().reshape(k, -1)
+        return Benders(config, list(hours), weights=list(weights), **kwargs)
+
+    def sizing_cost(self, concretize=False):
+        master = self.master
+        return master.total_opening_cost(concretize) + master.total_maintenance_cost(concretize) + \
+            master.total_incremental_cost(concretize)
+
+    @property
+    def gap(self):
+        if self.upper_bound == gp.GRB.INFINITY:
+            return gp.GRB.INFINITY
+
+        return (self.upper_bound - self.lower_bound) / max(abs(self.upper_bound), 1e-10)
+
+    def solve(self):
+        if self.processes:
+            context = multiprocessing.get_context('spawn')  # every worker starts its own Gurobi environment
+            with ProcessPoolExecutor(max_workers=self.processes, mp_context=context) as pool:
+                return self.iterate(pool.map)
+
+        return self.iterate(map)
+
+    def iterate(self, mapper):
+        master = self.master.model
+        variables = sizing_vars(self.master)
+        for iteration in range(self.max_iterations):
+            master.optimize()
+            if master.Status != gp.GRB.OPTIMAL:
+                raise RuntimeError(f'Benders master ended with status {master.Status}')
+
+            self.lower_bound = master.ObjVal
+            values = [int(round(v.X)) for v in variables]
+            jobs = [(self.config, hours.tolist(), weights, values, self.kwargs)
+                    for hours, weights in zip(self.periods, self.weights)]
+            cuts = list(mapper(dispatch_cut, jobs))
+
+            for theta, (feasible, value, gradient) in zip(self.theta, cuts):
+                change = gp.LinExpr(gradient, variables) - float(np.dot(gradient, values))
+                if feasible:
+                    master.addConstr(theta >= value + change)
+                else:
+                    master.addConstr(value + change <= 0)
+
+            infeasible = sum(not feasible for feasible, _, _ in cuts)
+            if not infeasible:
+                upper_bound = self.sizing_cost(concretize=True) + sum(value for _, value, _ in cuts)
+                if upper_bound < self.upper_bound:
+                    self.upper_bound = upper_bound
+                    self.sizing = sizing_from_values(values)
+
+            self.history.append({'iteration': iteration, 'lower_bound': self.lower_bound,
+                                 'upper_bound': self.upper_bound, 'infeasible_periods': infeasible})
+            if self.gap <= self.tolerance:
+                break
+
+        return self
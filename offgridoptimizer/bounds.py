@@ -0,0 +1,64 @@
+"""
+Big-M values derived from a Project's data, replacing the fixed M = 10000 and M = 1000000.
+
+Each bound holds for some optimal solution, so tightening a big-M to it keeps the optimum while
+strengthening the LP relaxation branch-and-bound works from. A derived value never exceeds the
+constant it replaces, so the model is never looser than before:
+
+- units of a product: the initial budget over its incremental cost and the monthly budget over its
+  maintenance cost
+- storage capacity: every storage product at its most units
+- energy sold in an hour: the most the largest affordable fleet generates, plus a full storage
+  emptied within the hour, less the demand. Grid energy is never sold in an optimum, it costs more
+  than it earns
+- grid usage: the demand of every hour plus what storage can take in, grid energy beyond that
+  is wasted
+- storage consumed: a full storage emptied every hour. Storing and consuming in the same hour
+  can always be netted, so nothing beyond the storage level is ever consumed
+"""
+import numpy as np
+
+from offgridoptimizer.product import Product
+
+# the constants the derived values replace
+MAX_UNITS = 10000
+MAX_GRID_USAGE = 10000
+MAX_STORAGE = 10000
+MAX_ENERGY = 1000000
+
+
+def max_units(product, initial_budget, monthly_budget):
+    limits = [MAX_UNITS]
+    if product.ic > 0:
+        limits.append(initial_budget / product.ic)
+    if product.mc > 0:
+        limits.append(monthly_budget / product.mc)
+
+    return max(0, int(np.floor(min(limits) + 1e-9)))
+
+
+class BigM:
+    def __init__(self, project):
+        self.units = [max_units(product, project.initial_budget, project.monthly_budget)
+                      for product in project.products]
+        units = dict(zip(project.products, self.units))
+
+        self.storage_capacity = min(sum(product.ca * units[product] for product in project.products
+                                        if product.et == Product.STORAGE), MAX_STORAGE)
+
+        generation = project.generation_products()
+        max_generation = project.efficiency_matrix(generation) @ np.array([units[product] for product in generation],
+                                                                           dtype=float)
+        demand = project.demand_array()
+
+        self.energy_sold = np.minimum(np.maximum(max_generation + self.storage_capacity - demand, 0), MAX_ENERGY)
+        self.grid_usage = min(float(np.sum(demand + self.storage_capacity)), MAX_GRID_USAGE)
+        self.storage_consumed = min(self.storage_capacity * len(demand), MAX_STORAGE)
+
+    def value(self, key):
+        """
+        :param key: (attribute, index) with index None for scalar bounds, e.g. ('units', 2) or ('grid_usage', None)
+        """
+        attribute, index = key
+        values = getattr(self, attribute)
+        return values if index is None else values[index]
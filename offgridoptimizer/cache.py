@@ -0,0 +1,140 @@
+"""
+Persistent solution cache: solved Projects stored under a hash of everything that decides their solution.
+
+The key covers the products and their costs, the budgets, location, grid and storage options, the
+fixed sizing bounds, the solver parameters that change the answer and the data the model was built
+from (the modelled hours with their weights and durations, demand, prices and efficiencies), so an
+edited Project or changed source data never hits an old entry. Entries hold the Solution arrays,
+from which selected products, costs and results_df are all derived, as a compressed .npz file.
+Only optimal solutions are stored.
+
+    cache = SolutionCache()
+    project = Project.project_from_config(config, hours=hours, cache=cache)
+    project.optimize()  # instant when the same config and hours were solved before
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from offgridoptimizer.series import cache_dir
+from offgridoptimizer.solution import Solution
+
+CACHE_VERSION = 1
+# parameters that can change the solution returned, the others only change how it is found
+SOLVER_PARAMS = ['MIPGap', 'MIPGapAbs', 'FeasibilityTol', 'IntFeasTol', 'OptimalityTol', 'Seed']
+
+
+def project_key(project):
+    """
+    Canonical hash of a Project, equal for two Projects that have the same optimal solution
+    """
+    model = project.model
+    model.update()
+    grid = project.grid
+    description = {'version': CACHE_VERSION,
+                   'products': [product.parameters() for product in project.products],
+                   'budget': [project.initial_budget, project.monthly_budget],
+                   'location': project.location,
+                   'grid': [grid.allow_grid, grid.grid_opening_cost, grid.artificial_grid_cost_kwh],
+                   'storage_formulation': project.storage_formulation,
+                   'build': project.build,
+                   'initial_storage': project.initial_storage,
+                   'bounds': [[v.LB, v.UB] for product in project.products for v in (product.y, product.x)] +
+                             [[v.LB, v.UB] for v in (grid.grid_installed, project.storage_installed)],
+                   'params': {name: model.getParamInfo(name)[2] for name in SOLVER_PARAMS}}
+
+    digest = hashlib.sha256(json.dumps(description, sort_keys=True).encode())
+    arrays = [np.asarray(project.hours, dtype=np.int64), project.weight_array(), project.duration_array(),
+              project.demand_array(), project.grid_price_array(), project.sale_price_array(),
+              project.efficiency_matrix(project.generation_products())]
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+
+    return digest.hexdigest()
+
+
+class SolutionCache:
+    """
+    Directory of solved Projects, evicted least recently used first once it grows beyond max_bytes,
+    and entries older than max_age seconds are dropped
+
+    hits and misses count lookups, see info().
+    """
+    def __init__(self, directory=None, max_bytes=256 * 2 ** 20, max_age=30 * 24 * 3600):
+        self.directory = cache_dir() / 'solutions' if directory is None else directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return self.directory / f'{key}.npz'
+
+    def get(self, key, project):
+        """
+        :return: the cached Solution of project, or None
+        """
+        path = self.path(key)
+        try:
+            with np.load(path) as entry:
+                expired = time.time() - float(entry['created']) > self.max_age
+                solution = None if expired else \
+                    Solution(project, *(entry[name] for name in Solution.ARRAYS), float(entry['grid_installed']),
+                             objective=float(entry['objective']), mip_gap=float(entry['mip_gap']))
+        except (OSError, KeyError, ValueError):
+            solution = None
+
+        if solution is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        os.utime(path)  # the modification time orders entries for eviction
+        return solution
+
+    def put(self, key, solution):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.directory / f'{key}.{os.getpid()}.tmp.npz'
+            np.savez_compressed(tmp_path, created=time.time(), grid_installed=solution.grid_installed,
+                                objective=solution.objective, mip_gap=solution.mip_gap,
+                                **{name: getattr(solution, name) for name in Solution.ARRAYS})
+            os.replace(tmp_path, self.path(key))
+        except OSError:
+            return  # a read-only cache directory only costs the re-solve
+
+        self.evict()
+
+    def evict(self):
+        entries = []
+        now = time.time()
+        for path in self.directory.glob('*.npz'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def info(self):
+        entries = list(self.directory.glob('*.npz'))
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(entries),
+                'bytes': sum(path.stat().st_size for path in entries)}
+
+    def clear(self):
+        for path in self.directory.glob('*.npz'):
+            path.unlink(missing_ok=True)
+        self.hits = 0
+        self.misses = 0
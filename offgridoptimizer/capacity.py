@@ -1,9 +1,8 @@
-import csv
 import itertools
 import pathlib
 from datetime import datetime
 
-from offgridoptimizer import hour_of_year, convert_time
+from offgridoptimizer.series import load_series
 
 
 class Capacity:
@@ -14,12 +13,7 @@ class Capacity:
     @classmethod
     def data_from_csv(cls, solar_capacity_path, wind_capacity_path):
         def process(path):
-            with open(path) as fp:
-                table = csv.DictReader(row for row in fp if not row.startswith('#'))
-                # data = [{"time": hour_of_year(convert_time(row)), "efficiency": float(row['electricity'])} for row in table]
-                data = {hour_of_year(convert_time(row)): float(row['electricity']) for row in table}
-
-            return data
+            return load_series(path, column='electricity', fmt="%Y-%m-%d %H:%M")
 
         solar_capacity = process(solar_capacity_path)
         wind_capacity = process(wind_capacity_path)
@@ -35,9 +29,12 @@ class Capacity:
         return Capacity.data_from_csv(solar_capacity_path=solar_capacity_path, wind_capacity_path=wind_capacity_path)
 
     def lookup(self, hour, energy_type):
+        return self.series(energy_type)[hour]
+
+    def series(self, energy_type):
         if energy_type == 'wind':
-            return self.hourly_wind_capacity[hour]
+            return self.hourly_wind_capacity
         elif energy_type == 'solar':
-            return self.hourly_solar_capacity[hour]
+            return self.hourly_solar_capacity
         else:
             assert False, "Only energy types available are wind and solar"
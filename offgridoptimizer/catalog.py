@@ -0,0 +1,108 @@
+"""
+Catalog presolve: drop the products no optimal sizing needs before the model is built.
+
+Every product becomes integer and binary decision variables, so a vendor catalog of hundreds of
+products makes a model that large even when few of them could ever be chosen. Two kinds are dropped:
+
+- dominated: another product of the same utility and energy type costs no more to open, buy and
+  maintain and has at least its capacity. Swapping every unit for the other product keeps a sizing
+  feasible at no higher cost, generation of one energy type follows the same efficiency series.
+  Of identical products the first one is kept
+- unaffordable: not a single unit fits the budgets, its incremental cost plus the cheapest opening
+  cost of its energy type exceeds the initial budget or its maintenance cost the monthly budget
+
+Any product of an energy type pays its opening, so the product with the cheapest opening cost of a
+type is kept even when unaffordable while other products of that type are kept; the type would
+otherwise get dearer to open.
+
+    catalog = CatalogPresolve(config['products'], initial_budget=40000, monthly_budget=500)
+    print(catalog.report())
+    project = Project.project_from_config(config, hours=hours, presolve_catalog=True)
+"""
+from collections import defaultdict
+
+import numpy as np
+from tabulate import tabulate
+
+from offgridoptimizer.product import Product
+
+DOMINATED = 'dominated'
+UNAFFORDABLE = 'unaffordable'
+COLUMNS = ['name', 'energy_type', 'reason', 'by']
+
+
+class CatalogPresolve:
+    def __init__(self, product_list, initial_budget, monthly_budget):
+        """
+        :param product_list: product dicts of a config
+        """
+        self.initial_budget = initial_budget
+        self.monthly_budget = monthly_budget
+        self.size = len(product_list)
+        products = Product.create_products(product_list)
+
+        reasons = {}
+        groups = defaultdict(list)
+        for i, product in enumerate(products):
+            groups[product.ut, product.et].append(i)
+        for indices in groups.values():
+            reasons.update(self.dominated(products, indices))
+
+        by_type = defaultdict(list)
+        for i, product in enumerate(products):
+            by_type[product.et].append(i)
+        for indices in by_type.values():
+            reasons.update(self.unaffordable(products, [i for i in indices if i not in reasons]))
+
+        # the product dicts still worth modelling in catalog order, and one row of COLUMNS per product left out
+        self.kept = [p for i, p in enumerate(product_list) if i not in reasons]
+        self.dropped = [dict(zip(COLUMNS, [products[i].name, products[i].et, reason, by]))
+                        for i, (reason, by) in sorted(reasons.items())]
+
+    @classmethod
+    def dominated(cls, products, indices):
+        """
+        :param indices: products of one utility and energy type
+        :return: {index: (DOMINATED, name of a kept product dominating it)}
+        """
+        costs = np.array([[products[i].oc, products[i].ic, products[i].mc, -products[i].ca] for i in indices],
+                         dtype=float)
+        # no_worse[j, i]: product j costs no more than product i and has at least its capacity
+        no_worse = np.all(costs[:, None, :] <= costs[None, :, :], axis=2)
+        better = np.any(costs[:, None, :] < costs[None, :, :], axis=2)
+        order = np.arange(len(indices))
+        # of identical products the first one dominates the others
+        dominates = no_worse & (better | (order[:, None] < order[None, :]))
+        dominated = dominates.any(axis=0)
+
+        # dominance is transitive, so some product that is not dominated itself dominates each dropped one
+        return {indices[i]: (DOMINATED, products[indices[np.flatnonzero(dominates[:, i] & ~dominated)[0]]].name)
+                for i in np.flatnonzero(dominated)}
+
+    def unaffordable(self, products, indices):
+        """
+        :param indices: products of one energy type that are not dominated
+        :return: {index: (UNAFFORDABLE, the budget that rules it out)}
+        """
+        if not indices:
+            return {}
+
+        opening_cost = min(products[i].oc for i in indices)
+        reasons = {}
+        for i in indices:
+            product = products[i]
+            if opening_cost + product.ic > self.initial_budget:
+                reasons[i] = (UNAFFORDABLE, 'initial budget')
+            elif product.mc > self.monthly_budget:
+                reasons[i] = (UNAFFORDABLE, 'monthly budget')
+
+        kept = [i for i in indices if i not in reasons]
+        if kept and min(products[i].oc for i in kept) > opening_cost:
+            # keep the cheapest way to open the type, its units stay limited by the budgets
+            reasons.pop(min(indices, key=lambda i: products[i].oc))
+
+        return reasons
+
+    def report(self):
+        table = tabulate([[row[column] for column in COLUMNS] for row in self.dropped], headers=COLUMNS)
+        return f'{len(self.kept)} of {self.size} products kept\n{table}'
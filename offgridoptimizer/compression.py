@@ -0,0 +1,71 @@
+"""
+Presolve that merges runs of consecutive hours with identical inputs into one time step.
+
+A step stands for `duration` hours: its decision variables are per-hour rates held for the whole run
+and grid costs and sales are weighted by the duration. Every per-hour constraint of the run has the
+same coefficients and right hand side, so it only needs to be written once.
+
+Compression only applies to models without storage. Every step solution then expands to an hourly
+solution of the same cost and, conversely, averaging an hourly solution over a run keeps it feasible,
+so the optimum is unchanged. Storage couples the hours of a run through its level, so no hour is
+merged when a storage product is modelled and such models are solved hour by hour.
+"""
+import numpy as np
+
+from offgridoptimizer.product import Product
+
+
+class CompressedHours:
+    def __init__(self, hours, durations, weights):
+        self.hours = hours          # first hour of each step
+        self.durations = durations  # number of hours merged into each step
+        self.weights = weights      # cost weight of each step (the sum of the merged hours' weights)
+
+    def expand(self, values):
+        """
+        Repeat one value per step for every hour it stands for
+        """
+        return np.repeat(np.asarray(values), self.durations)
+
+    def expanded_hours(self):
+        offsets = np.arange(self.durations.sum()) - np.repeat(np.cumsum(self.durations) - self.durations,
+                                                              self.durations)
+        return self.expand(self.hours) + offsets
+
+
+def model_inputs(profile, hours, products):
+    """
+    Every hourly input the model reads: demand, grid price and the efficiency of each energy type in use
+    """
+    energy_types = sorted({product.et for product in products
+                           if product.ut == Product.ELEC and product.et != Product.STORAGE})
+    columns = [profile.demand.hourly_demand.take(hours), profile.hourly_grid.take(hours)] + \
+              [profile.efficiency.series(energy_type).take(hours) for energy_type in energy_types]
+    return np.column_stack(columns)
+
+
+def compress_hours(profile, hours, products, weights=None):
+    """
+    Merge consecutive hours whose model inputs and weights are identical
+
+    Hour 0 is never merged since the first hour of the year starts with an empty battery, and no hour
+    is merged when products include storage, see the module docstring.
+
+    :param profile: LocationProfile the inputs are read from
+    :param hours: hours of the year to compress, in model order
+    :param products: products of the Project, only the efficiencies of their energy types matter
+    :param weights: optional cost weight of every hour
+    :return: CompressedHours
+    """
+    hours = np.asarray(hours, dtype=int)
+    weights = np.ones(len(hours)) if weights is None else np.asarray(weights, dtype=float)
+    if len(hours) == 0:
+        return CompressedHours(hours, np.zeros(0, dtype=int), weights)
+
+    inputs = np.column_stack([model_inputs(profile, hours, products), weights])
+    continues = (np.diff(hours) == 1) & (inputs[1:] == inputs[:-1]).all(axis=1) & (hours[:-1] != 0)
+    if any(product.et == Product.STORAGE for product in products):
+        continues[:] = False
+    starts = np.flatnonzero(np.concatenate([[True], ~continues]))
+    durations = np.diff(np.append(starts, len(hours)))
+    return CompressedHours(hours[starts], durations, weights[starts] * durations)
@@ -1,4 +1,9 @@
+import gurobipy as gp
+import numpy as np
+
 from offgridoptimizer import Product
+from offgridoptimizer.product import StorageProduct
+from offgridoptimizer.bounds import BigM
 MONTHS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
 
 
@@ -6,15 +11,50 @@ class Constraint:
     def __init__(self, project):
         self.project = project
         self.constraints = []
+        # (constraint, position in project.hours, sign) of every constraint whose right hand side holds
+        # sign * the demand of that hour, so demand edits only move right hand sides, see shift_demand
+        self.demand_links = []
+        self.demand_mlinks = []  # (MConstr, positions, sign), the same for matrix constraints
 
     def update_constraints(self):
         raise NotImplementedError()
 
+    def add(self, constraint):
+        c = self.project.model.addConstr(constraint)
+        self.constraints.append(c)
+        return c
+
+    def link_demand(self, constraint, position, sign):
+        if isinstance(constraint, gp.MConstr):
+            self.demand_mlinks.append((constraint, position, sign))
+        else:
+            self.demand_links.append((constraint, position, sign))
+
+    def shift_demand(self, delta):
+        """
+        Move the right hand side of every demand-linked constraint in place
+
+        :param delta: new minus old demand, one value per modelled hour
+        """
+        model = self.project.model
+        model.update()  # constraints still pending since the build have no attributes yet
+        for constraint, positions, sign in self.demand_mlinks:
+            constraint.RHS = constraint.RHS + sign * delta[positions]
+
+        if self.demand_links:
+            constraints, positions, signs = zip(*self.demand_links)
+            rhs = np.array(model.getAttr('RHS', list(constraints)))
+            model.setAttr('RHS', list(constraints), (rhs + np.array(signs) * delta[list(positions)]).tolist())
+
     def clear_constraints(self):
         m = self.project.model
         for c in self.constraints:
             m.remove(c)
 
+        self.constraints = []
+        self.demand_links = []
+        self.demand_mlinks = []
+
 
 class DemandConstraint(Constraint):
     def __init__(self, project):
@@ -25,12 +65,11 @@ class DemandConstraint(Constraint):
         self.clear_constraints()
         p = self.project
         m = p.model
-        for hour in p.hours:
+        for position, hour in enumerate(p.hours):
             total_electricity_capacity = p.electricity_capacity(hour=hour) + \
                                          p.storage_consumed(hour=hour) + \
                                          p.grid_capacity(hour=hour)
-            self.constraints.append(m.addConstr(total_electricity_capacity >=
-                                                p.electricity_demand(hour=hour)))
+            self.link_demand(self.add(total_electricity_capacity >= p.electricity_demand(hour=hour)), position, 1)
 
 
 class ProductConstraint(Constraint):
@@ -40,87 +79,154 @@ class ProductConstraint(Constraint):
 
     def update_constraints(self):
         self.clear_constraints()
+        self.bound_links = []  # (constraint, variable, sign, BigM key) of every big-M coefficient
+        self.unit_limits = []  # (constraint, product index) of the upper bounds on units
+        self.bounds = BigM(self.project)
         proj = self.project
-        model = proj.model
+        bounds = self.bounds
         # if any units of an energy type are installed, require at least 1 opening cost to be paid
         # (e.g., one large and one small solar panel results in a single solar opening cost)
-        M = 10000
-        for product in proj.products:
-            c1 = model.addConstr(sum(p.x for p in proj.products_by_type(product.et)) * M >= product.y)
-            c2 = model.addConstr(M >= product.y)
-            self.constraints.extend([c1, c2])
+        for i, product in enumerate(proj.products):
+            openings = proj.products_by_type(product.et)
+            c = self.add(sum(p.x for p in openings) * bounds.units[i] >= product.y)
+            for p in openings:
+                self.link_bound(c, p.x, 1, ('units', i))
+            self.unit_limits.append((self.add(product.y <= bounds.units[i]), i))
 
-        c = model.addConstr(proj.grid.grid_installed * M >= sum(proj.grid_capacity(hour=hour) for hour in self.project.hours))
-        self.constraints.append(c)
+        c = self.add(proj.grid.grid_installed * bounds.grid_usage >= self.total_grid_usage())
+        self.link_bound(c, proj.grid.grid_installed, 1, ('grid_usage', None))
 
-        c = model.addConstr(proj.storage_installed * M >=
-                            sum(product.ca * product.y for product in proj.products if
-                                product.et == Product.STORAGE))
-        self.constraints.append(c)
+        c = self.add(proj.storage_installed * bounds.storage_capacity >=
+                     sum(product.ca * product.y for product in proj.products if
+                         product.et == Product.STORAGE))
+        self.link_bound(c, proj.storage_installed, 1, ('storage_capacity', None))
 
-        c = model.addConstr(proj.storage_installed * M >=
-                            sum(proj.storage_consumed(hour=hour) for hour in self.project.hours))
-        self.constraints.append(c)
+        c = self.add(proj.storage_installed * bounds.storage_consumed >= self.total_storage_consumed())
+        self.link_bound(c, proj.storage_installed, 1, ('storage_consumed', None))
 
         # force at only one opening cost to be paid per energy type
         # (e.g., one large and one small solar panel results in a single solar opening cost)
         for et in Product.ENERGY_TYPES:
-            c = model.addConstr(sum(p.x for p in proj.products_by_type(et)) <= 1)
-            self.constraints.append(c)
+            self.add(sum(p.x for p in proj.products_by_type(et)) <= 1)
 
         total_storage_capacity = sum(product.ca * product.y for product in proj.products if
                                      product.et == Product.STORAGE)
+
+        with proj.build_phase('product_constraints.storage'):
+            self.storage_constraints(total_storage_capacity)
+
+    def link_bound(self, constraint, variable, sign, key):
+        self.bound_links.append((constraint, variable, sign, key))
+
+    def update_bounds(self):
+        """
+        Re-derive the big-M values after a budget, cost or demand edit and change their coefficients in place
+        """
+        proj = self.project
+        model = proj.model
+        model.update()
+        self.bounds = BigM(proj)
+        for constraint, variable, sign, (attribute, index) in self.bound_links:
+            if isinstance(constraint, gp.MConstr):
+                # matrix constraints over all hours, or 0-d ones such as a sum over every hour
+                constraints = np.atleast_1d(np.array(constraint.tolist(), dtype=object)).tolist()
+                values = np.broadcast_to(sign * self.bounds.value((attribute, index)), len(constraints))
+                for c, value in zip(constraints, values.tolist()):
+                    model.chgCoeff(c, variable, value)
+            else:
+                model.chgCoeff(constraint, variable, sign * self.bounds.value((attribute, index)))
+
+        for constraint, i in self.unit_limits:
+            constraint.RHS = self.bounds.units[i]
+
+    def total_grid_usage(self):
+        return sum(self.project.grid_capacity(hour=hour) for hour in self.project.hours)
+
+    def total_storage_consumed(self):
+        return sum(self.project.storage_consumed(hour=hour) for hour in self.project.hours)
+
+    def storage_constraints(self, total_storage_capacity):
+        if self.project.storage_formulation == StorageProduct.STATE_OF_CHARGE:
+            self.state_of_charge_constraints(total_storage_capacity)
+        else:
+            self.cumulative_storage_constraints(total_storage_capacity)
+
+    def cumulative_storage_constraints(self, total_storage_capacity):
+        # storage level at each hour is rebuilt as the sum of everything stored and consumed so far,
+        # which makes the model grow quadratically with the number of hours
+        proj = self.project
         times = []
         stored = []
         consumed = []
 
-        for hour in self.project.hours:
+        for position, hour in enumerate(proj.hours):
             times.append(hour)
-            if hour % 1000 == 0:
-                print(hour)
             stored.append(proj.energy_stored(hour))
             consumed.append(proj.storage_consumed(hour))
 
             total_stored = sum(stored)
             total_consumed = sum(consumed)
 
-            existing_storage = total_stored - total_consumed
-            M = 1000000
-
-            model.addConstr(existing_storage <= total_storage_capacity)
-            model.addConstr(-(1 - proj.storage_installed) * M <= existing_storage)
-            model.addConstr(self.project.energy_sold(hour) <= self.project.grid.grid_installed * M )
-
-            if hour == 0:
-                inital_storage_level = total_storage_capacity * 0
-                model.addConstr(proj.energy_stored(hour=0) == inital_storage_level)
-                model.addConstr(self.project.energy_stored(hour) <=
-                                inital_storage_level +
-                                self.project.electricity_capacity(hour) +
-                                self.project.storage_consumed(hour) +
-                                self.project.grid_capacity(hour) -
-                                self.project.electricity_demand(hour) -
-                                self.project.energy_sold(hour))
-            else:
-                # # TODO product.x needs to be 1 if ANY storage has been selected (done). this may be a problem with cost calculation too...
-                model.addConstr(self.project.energy_stored(hour) <=
-                                self.project.electricity_capacity(hour) +
-                                self.project.storage_consumed(hour) +
-                                self.project.grid_capacity(hour) -
-                                self.project.electricity_demand(hour) -
-                                self.project.energy_sold(hour))
-
-            model.addConstr(
-                self.project.storage_consumed(hour) <=
-                self.project.grid_capacity(hour) +
-                existing_storage +
-                self.project.electricity_capacity(hour) -
-                self.project.energy_sold(hour) -
-                self.project.electricity_demand(hour)
-            )
+            existing_storage = proj.initial_storage + total_stored - total_consumed
+            self.hourly_storage_constraints(position, hour, existing_storage, total_storage_capacity)
 
+    def state_of_charge_constraints(self, total_storage_capacity):
+        # each storage product carries its own level from one hour to the next,
+        # which keeps the model linear in the number of hours
+        proj = self.project
+        previous = None
+        for position, hour in enumerate(proj.hours):
+            for product in proj.products_by_type(Product.STORAGE):
+                prior_level = product.storage_level(previous) if previous is not None else 0
+                self.add(product.storage_level(hour) ==
+                         prior_level + product.energy_stored(hour) - product.storage_consumed(hour))
 
-class BudgetConstraint(Constraint):
+            self.hourly_storage_constraints(position, hour, proj.storage_level(hour), total_storage_capacity)
+            previous = hour
+
+    def hourly_storage_constraints(self, position, hour, existing_storage, total_storage_capacity):
+        proj = self.project
+
+        self.add(existing_storage <= total_storage_capacity)
+        # without storage installed nothing is consumed, so the level is a sum of stored energy and
+        # the big-M this used to be relaxed by is 0
+        self.add(existing_storage >= 0)
+        c = self.add(self.project.energy_sold(hour) <= self.project.grid.grid_installed *
+                     self.bounds.energy_sold[position])
+        self.link_bound(c, self.project.grid.grid_installed, -1, ('energy_sold', position))
+
+        if hour == 0:
+            inital_storage_level = total_storage_capacity * 0
+            self.add(proj.energy_stored(hour=0) == inital_storage_level)
+            c = self.add(self.project.energy_stored(hour) <=
+                            inital_storage_level +
+                            self.project.electricity_capacity(hour) +
+                            self.project.storage_consumed(hour) +
+                            self.project.grid_capacity(hour) -
+                            self.project.electricity_demand(hour) -
+                            self.project.energy_sold(hour))
+        else:
+            # # TODO product.x needs to be 1 if ANY storage has been selected (done). this may be a problem with cost calculation too...
+            c = self.add(self.project.energy_stored(hour) <=
+                            self.project.electricity_capacity(hour) +
+                            self.project.storage_consumed(hour) +
+                            self.project.grid_capacity(hour) -
+                            self.project.electricity_demand(hour) -
+                            self.project.energy_sold(hour))
+        self.link_demand(c, position, -1)
+
+        c = self.add(
+            self.project.storage_consumed(hour) <=
+            self.project.grid_capacity(hour) +
+            existing_storage +
+            self.project.electricity_capacity(hour) -
+            self.project.energy_sold(hour) -
+            self.project.electricity_demand(hour)
+        )
+        self.link_demand(c, position, -1)
+
+
+class MatrixDemandConstraint(Constraint):
     def __init__(self, project):
         super().__init__(project)
         self.update_constraints()
@@ -129,6 +235,81 @@ class BudgetConstraint(Constraint):
         self.clear_constraints()
         p = self.project
         m = p.model
-        self.constraints = [m.addConstr(p.capital_costs() <= p.initial_budget),
-                            m.addConstr(p.operational_costs() <= p.monthly_budget)]
-        m.addConstr(p.total_revenue() <= p.grid.actual_total_grid_cost())
\ No newline at end of file
+        total_electricity_capacity = p.electricity_capacity_mvar() + \
+                                     p.storage_consumed_mvar() + \
+                                     p.grid.hourly_usage_mvar
+        self.link_demand(self.add(total_electricity_capacity >= p.demand_array()), np.arange(len(p.hours)), 1)
+
+
+class MatrixProductConstraint(ProductConstraint):
+    """
+    Same constraints as ProductConstraint with the state-of-charge storage formulation,
+    but every hourly family is added as one matrix constraint over all hours.
+    """
+    def total_grid_usage(self):
+        return self.project.grid.hourly_usage_mvar.sum()
+
+    def total_storage_consumed(self):
+        return self.project.storage_consumed_mvar().sum()
+
+    def storage_constraints(self, total_storage_capacity):
+        proj = self.project
+        hours = proj.hours
+        num_hours = len(hours)
+
+        storage_products = proj.products_by_type(Product.STORAGE)
+        for product in storage_products:
+            self.add(product.soc_mvar[0] == product.b_mvar[0] - product.sc_mvar[0])
+            if num_hours > 1:
+                self.add(product.soc_mvar[1:] == product.soc_mvar[:-1] + product.b_mvar[1:] - product.sc_mvar[1:])
+
+        # every hour shares the same right hand side for the storage capacity and sizing binaries,
+        # so they enter as a column of ones times the sizing variable
+        ones = np.ones((num_hours, 1))
+        storage_capacity = ones @ np.array([[product.ca for product in storage_products]])
+        storage_units = gp.MVar.fromlist([product.y for product in storage_products])
+        grid_installed = gp.MVar.fromlist([proj.grid.grid_installed])
+
+        existing_storage = proj.storage_level_mvar()
+        stored = proj.energy_stored_mvar()
+        consumed = proj.storage_consumed_mvar()
+        capacity = proj.electricity_capacity_mvar()
+        grid = proj.grid.hourly_usage_mvar
+        sold = proj.ss_mvar
+        demand = proj.demand_array()
+
+        if storage_products:
+            self.add(existing_storage - storage_capacity @ storage_units <= 0)
+        self.add(existing_storage >= 0)  # see ProductConstraint.hourly_storage_constraints
+        c = self.add(sold - self.bounds.energy_sold.reshape(-1, 1) @ grid_installed <= 0)
+        self.link_bound(c, proj.grid.grid_installed, -1, ('energy_sold', slice(None)))
+
+        for idx in np.flatnonzero(np.asarray(hours) == 0):
+            self.add(stored[idx] == 0)
+        positions = np.arange(num_hours)
+        self.link_demand(self.add(stored <= capacity + consumed + grid - demand - sold), positions, -1)
+        self.link_demand(self.add(consumed <= grid + existing_storage + capacity - sold - demand), positions, -1)
+
+
+class BudgetConstraint(Constraint):
+    def __init__(self, project):
+        super().__init__(project)
+        self.update_constraints()
+
+    def update_constraints(self):
+        self.clear_constraints()
+        p = self.project
+        self.capital = self.add(p.capital_costs() <= p.initial_budget)
+        self.operational = self.add(p.operational_costs() <= p.monthly_budget)
+        self.revenue = self.add(p.total_revenue() <= p.grid.actual_total_grid_cost())
+
+    def update_budget(self, initial_budget, monthly_budget):
+        # the budgets are the only constants of their constraints, so they are the right hand sides
+        self.capital.RHS = initial_budget
+        self.operational.RHS = monthly_budget
+
+    def update_product_costs(self, product):
+        m = self.project.model
+        m.chgCoeff(self.capital, product.x, product.oc)
+        m.chgCoeff(self.capital, product.y, product.ic)
+        m.chgCoeff(self.operational, product.y, product.mc)
\ No newline at end of file
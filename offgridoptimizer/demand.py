@@ -1,9 +1,8 @@
-import csv
 import itertools
 import pathlib
 from datetime import datetime
 
-from offgridoptimizer import convert_time, hour_of_year
+from offgridoptimizer.series import load_series
 
 
 class Demand:
@@ -12,19 +11,7 @@ class Demand:
 
     @classmethod
     def data_from_csv(cls, demand_path):
-        with open(demand_path) as fp:
-            table = csv.DictReader(row for row in fp if not row.startswith('#'))
-
-            # for idx, row in enumerate(table):
-            #     val = hour_of_year(convert_time(row, fmt="%m-%d-%Y %H:%M"))
-            #     # assert val == idx or idx == 1416, (val, idx,)
-            #     if val != idx:
-            #         print((idx, val))
-            #       break
-            #
-            # raise ValueError()
-
-            hourly_demand = {hour_of_year(convert_time(row, fmt="%m-%d-%Y %H:%M")): float(row['demand']) for row in table}
+        hourly_demand = load_series(demand_path, column='demand', fmt="%m-%d-%Y %H:%M")
 
         return Demand(hourly_demand=hourly_demand)
 
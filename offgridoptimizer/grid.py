@@ -1,9 +1,8 @@
 import gurobipy as gp
-import csv
 from datetime import datetime
 import pathlib
 
-from offgridoptimizer import convert_time, hour_of_year
+from offgridoptimizer.series import load_series
 
 NUM_HOURS = 24
 
@@ -14,10 +13,11 @@ class Grid:
     def __init__(self, project, hourly_grid, allow_grid, model=None, grid_opening_cost=10000):
         self.project = project
         self.hourly_usage = None
+        self.hourly_usage_mvar = None
         self.grid_installed = None
         self.grid_opening_cost = grid_opening_cost
         self.hourly_grid = hourly_grid
-        self.hourly_grid_sale = {k: v * 1 for k, v in hourly_grid.items()}
+        self.hourly_grid_sale = hourly_grid.scale(1)
         self.artificial_grid_cost_kwh = 200  # TODO: change this to large value
         self.allow_grid = allow_grid
         if model:
@@ -27,16 +27,30 @@ class Grid:
             model.addConstr(self.grid_installed == 0)
 
     def init_dvs(self, model):
-        self.hourly_usage = {hour: model.addVar() for hour in self.project.hours}
+        if self.project.matrix_build:
+            self.hourly_usage_mvar = model.addMVar(len(self.project.hours))
+            self.hourly_usage = dict(zip(self.project.hours, self.hourly_usage_mvar.tolist()))
+        else:
+            self.hourly_usage = {hour: model.addVar() for hour in self.project.hours}
         self.grid_installed = model.addVar(vtype=gp.GRB.BINARY)  # TODO add binary variable for grid installed
 
     def artificial_total_grid_cost(self, concretize=False):
-        return sum(g * self.artificial_grid_cost_kwh for hour, g in self.hourly_usage.items()) if not concretize else \
-            sum(g.x * self.artificial_grid_cost_kwh for hour, g in self.hourly_usage.items())
+        weights = self.project.weights
+        if self.project.matrix_build and not concretize:
+            return gp.LinExpr((self.artificial_grid_cost_kwh * self.project.weight_array()).tolist(),
+                              self.hourly_usage_mvar.tolist())
+
+        return sum(g * self.artificial_grid_cost_kwh * weights[hour] for hour, g in self.hourly_usage.items()) if not concretize else \
+            sum(g.x * self.artificial_grid_cost_kwh * weights[hour] for hour, g in self.hourly_usage.items())
 
     def actual_total_grid_cost(self, concretize=False):
-        return sum(g * self.hourly_grid[hour] for hour, g in self.hourly_usage.items()) if not concretize else \
-                    sum(g.x * self.hourly_grid[hour] for hour, g in self.hourly_usage.items())
+        weights = self.project.weights
+        if self.project.matrix_build and not concretize:
+            return gp.LinExpr((self.project.grid_price_array() * self.project.weight_array()).tolist(),
+                              self.hourly_usage_mvar.tolist())
+
+        return sum(g * self.hourly_grid[hour] * weights[hour] for hour, g in self.hourly_usage.items()) if not concretize else \
+                    sum(g.x * self.hourly_grid[hour] * weights[hour] for hour, g in self.hourly_usage.items())
 
     def electricity_usage(self, hour, concretize=False):
         return self.hourly_usage[hour] if concretize is False else self.hourly_usage[hour].x
@@ -46,15 +60,20 @@ class Grid:
 
     @classmethod
     def data_from_csv(cls, grid_path, allow_grid, model=None, project=None):
-        with open(grid_path) as fp:
-            table = csv.DictReader(row for row in fp if not row.startswith('#'))
-            hourly_grid = {hour_of_year(convert_time(row,fmt = "%m-%d-%Y %H:%M")): float(row['grid_cost']) for row in table}
+        hourly_grid = Grid.prices_from_csv(grid_path)
 
         return Grid(hourly_grid=hourly_grid, allow_grid=allow_grid, model=model, project=project)
 
     @classmethod
-    def from_location(cls, location, allow_grid, model=None, project=None):
+    def prices_from_csv(cls, grid_path):
+        return load_series(grid_path, column='grid_cost', fmt="%m-%d-%Y %H:%M")
+
+    @classmethod
+    def grid_path(cls, location):
         project_root = pathlib.Path(__file__).parent.parent
         tlocation = location.replace(",", "_").lower()
-        grid_path = project_root / 'data' / 'grid_data' / f'grid_{tlocation}.csv'
-        return Grid.data_from_csv(grid_path=grid_path, allow_grid=allow_grid, model=model, project=project)
+        return project_root / 'data' / 'grid_data' / f'grid_{tlocation}.csv'
+
+    @classmethod
+    def from_location(cls, location, allow_grid, model=None, project=None):
+        return Grid.data_from_csv(grid_path=Grid.grid_path(location), allow_grid=allow_grid, model=model, project=project)
@@ -0,0 +1,276 @@
+"""
+Sizing heuristics: a greedy MIP start for Project.optimize, and a rounded LP relaxation for screening.
+
+On tight budgets Gurobi can search a long time before its first incumbent. GreedyStart builds one
+constructively instead: starting from nothing installed it keeps adding the batch of units of one
+product that lowers an estimate of the objective the most while the sizing fits both budgets. The
+estimate is the sizing's costs plus the artificial grid cost of the energy it leaves unserved, found
+by a simple hour by hour simulation of generation and storage. Whatever is left unserved falls back
+on the grid when allow_grid is set, whose opening cost is kept out of the initial budget from the start.
+
+The dispatch matching the sizing is then solved exactly, as a copy of the model with the sizing fixed,
+and every variable's value becomes the MIP start.
+
+    start = GreedyStart(project)
+    start.apply()
+    project.optimize()
+
+RoundedRelaxation skips branch-and-bound altogether, for screening many configs. It solves the LP
+relaxation of the model, whose objective is a lower bound on the optimum, rounds the units of every
+product to the nearest integer, repairs the rounded sizing into the budgets by dropping the units
+whose loss raises the estimate least and improves it greedily as above. The Project's own model is
+then optimized with that sizing fixed, storage_installed included, which leaves only the dispatch LP,
+so the Project holds the rounded solution and its cost is within the reported gap of the optimum.
+
+    rounded = RoundedRelaxation(project)
+    print(rounded.objective, rounded.lower_bound, rounded.gap)
+    project.costs()
+"""
+import time
+
+import gurobipy as gp
+import numpy as np
+
+from offgridoptimizer.bounds import max_units
+from offgridoptimizer.product import Product
+from offgridoptimizer.project import Sizing
+from offgridoptimizer.telemetry import relative_gap
+
+
+class SizingHeuristic:
+    """
+    What the heuristics share: costs of a sizing, its estimated objective and the exact dispatch of a sizing
+    """
+    def __init__(self, project):
+        self.project = project
+        products = project.products
+        self.ic = np.array([product.ic for product in products], dtype=float)
+        self.mc = np.array([product.mc for product in products], dtype=float)
+        # the model's own limit on the units of each product, also for products that cost nothing
+        self.max_units = np.array([max_units(product, project.initial_budget, project.monthly_budget)
+                                   for product in products], dtype=int)
+        self.storage_capacity = np.array([product.ca if product.et == Product.STORAGE else 0 for product in products],
+                                         dtype=float)
+        # hourly generation of one unit of each product, a zero column for products generating nothing
+        self.generation = np.zeros((len(project.hours), len(products)))
+        generation = [i for i, product in enumerate(products)
+                      if product.ut == Product.ELEC and product.et != Product.STORAGE]
+        self.generation[:, generation] = project.efficiency_matrix(project.generation_products())
+        self.demand = project.demand_array()
+        self.weights = project.weight_array()
+        # the cheapest product of each energy type opens it, any product of the type pays its opening
+        self.openers = {product.et: min(project.products_by_type(product.et), key=lambda p: p.oc)
+                        for product in products}
+        # what is left of the initial budget for products, with the grid's opening cost kept aside when allowed
+        grid = project.grid
+        self.capital = project.initial_budget - (grid.grid_opening_cost if grid.allow_grid else 0)
+
+    def fits(self, units):
+        return self.capital_cost(units) <= self.capital and units @ self.mc <= self.project.monthly_budget and \
+            bool(np.all(units <= self.max_units))
+
+    def improve(self, units):
+        """
+        Keep adding the batch of units of one product that lowers the estimate most while the sizing fits
+        """
+        estimate = self.estimate(units)
+        while True:
+            best = None
+            for i in range(len(units)):
+                # batches of 1, 2, 4, ... units, so an opening cost only paid off by several units is crossed
+                batch = 1
+                while True:
+                    candidate = units.copy()
+                    candidate[i] += batch
+                    if not self.fits(candidate):
+                        break
+
+                    value = self.estimate(candidate)
+                    if best is None or value < best[0]:
+                        best = (value, candidate)
+                    batch *= 2
+
+            if best is None or best[0] >= estimate - 1e-9:
+                break
+            estimate, units = best
+
+        self.estimated_objective = estimate
+        return units
+
+    def sizing_of(self, units):
+        opened = self.opened_types(units)
+        return Sizing(units=units.tolist(),
+                      opened=[int(product.et in opened and self.openers[product.et] is product)
+                              for product in self.project.products],
+                      grid_installed=int(self.project.grid.allow_grid and bool(np.any(self.unserved(units) > 1e-9))))
+
+    def with_grid(self, sizing):
+        """
+        :return: sizing with the grid installed, or None when the grid is not allowed or already installed
+        """
+        if not self.project.grid.allow_grid or sizing.grid_installed:
+            return None
+
+        return sizing._replace(grid_installed=1)
+
+    def opened_types(self, units):
+        return {self.project.products[i].et for i in np.flatnonzero(units)}
+
+    def capital_cost(self, units):
+        return units @ self.ic + sum(self.openers[et].oc for et in self.opened_types(units))
+
+    def estimate(self, units):
+        grid = self.project.grid
+        costs = self.capital_cost(units) + units @ self.mc
+        unserved = self.unserved(units)
+        if grid.allow_grid and np.any(unserved > 1e-9):
+            costs += grid.grid_opening_cost
+
+        return costs + grid.artificial_grid_cost_kwh * (unserved @ self.weights)
+
+    def unserved(self, units):
+        """
+        :return: demand left over in each modelled hour once generation and storage have served it
+        """
+        net = self.generation @ units - self.demand
+        capacity = units @ self.storage_capacity
+        if capacity <= 0:
+            return np.maximum(-net, 0)
+
+        unserved = np.zeros(len(net))
+        level = self.project.initial_storage
+        for position, surplus in enumerate(net.tolist()):
+            if surplus >= 0:
+                level += max(min(surplus, capacity - level), 0)
+            else:
+                # the level left after an hour has to cover twice what the hour consumed,
+                # see ProductConstraint.hourly_storage_constraints
+                consumed = min(-surplus, level / 3)
+                level -= consumed
+                unserved[position] = -surplus - consumed
+
+        return unserved
+
+    def sizing_values(self, sizing):
+        project = self.project
+        return [(product.y, units) for product, units in zip(project.products, sizing.units)] + \
+            [(product.x, opened) for product, opened in zip(project.products, sizing.opened)] + \
+            [(project.grid.grid_installed, sizing.grid_installed)]
+
+    def dispatch(self, sizing):
+        """
+        Solve the dispatch of sizing on a copy of the model, so the Project's own model is left untouched
+
+        :return: (value of every variable of the model, objective), (None, None) when infeasible
+        """
+        model = self.project.model
+        model.update()
+        fixed = model.copy()
+        fixed.setParam('OutputFlag', 0)
+        variables = fixed.getVars()
+        for variable, value in self.sizing_values(sizing):
+            variables[variable.index].LB = variables[variable.index].UB = value
+
+        fixed.optimize()
+        values = objective = None
+        if fixed.SolCount:
+            values, objective = fixed.getAttr('X', variables), fixed.ObjVal
+        fixed.dispose()
+        return values, objective
+
+
+class GreedyStart(SizingHeuristic):
+    def __init__(self, project):
+        begin = time.perf_counter()
+        super().__init__(project)
+        self.sizing = self.sizing_of(self.improve(np.zeros(len(project.products), dtype=int)))
+        # every variable's value for the sizing and its dispatch, None when the sizing has no feasible
+        # dispatch, e.g. with demand left unserved and no grid to fall back on
+        self.values, self.objective = self.dispatch(self.sizing)
+        if self.values is None and self.with_grid(self.sizing) is not None:
+            # the simulation can miss demand the exact dispatch leaves unserved
+            self.sizing = self.with_grid(self.sizing)
+            self.values, self.objective = self.dispatch(self.sizing)
+        self.seconds = time.perf_counter() - begin
+
+    @property
+    def feasible(self):
+        return self.values is not None
+
+    def apply(self):
+        """
+        Hand the sizing and its dispatch to the Project's model as the MIP start of its next optimize
+
+        :return: whether there was a feasible start to hand over
+        """
+        if not self.feasible:
+            return False
+
+        self.project.set_start(self.values)
+        return True
+
+
+class RoundedRelaxation(SizingHeuristic):
+    def __init__(self, project):
+        """
+        Solve project's LP relaxation and its rounded sizing, the Project is left with the sizing fixed
+        """
+        begin = time.perf_counter()
+        super().__init__(project)
+        model = project.model
+        model.update()
+        relaxed = model.relax()
+        relaxed.setParam('OutputFlag', 0)
+        relaxed.optimize()
+        # the rounded solution's objective and the relaxation's, both None when the relaxation is infeasible,
+        # objective also when the rounded sizing has no feasible dispatch
+        self.lower_bound = self.relaxed_units = self.sizing = self.objective = None
+        if relaxed.Status == gp.GRB.OPTIMAL:
+            self.lower_bound = relaxed.ObjVal
+            variables = relaxed.getVars()
+            self.relaxed_units = np.array([variables[product.y.index].X for product in project.products])
+        relaxed.dispose()
+        self.relaxation_seconds = time.perf_counter() - begin
+
+        if self.relaxed_units is not None:
+            self.sizing = self.sizing_of(self.improve(self.repair(np.rint(self.relaxed_units).astype(int))))
+            self.objective = self.solve_dispatch()
+        self.seconds = time.perf_counter() - begin
+
+    @property
+    def gap(self):
+        if self.objective is None or self.lower_bound is None:
+            return None
+
+        return relative_gap(self.objective, self.lower_bound)
+
+    def repair(self, units):
+        """
+        Drop units until the sizing fits the budgets, each time the unit whose loss raises the estimate least
+        """
+        while np.any(units) and not self.fits(units):
+            candidates = []
+            for i in np.flatnonzero(units):
+                candidate = units.copy()
+                candidate[i] -= 1
+                candidates.append((self.estimate(candidate), i, candidate))
+            units = min(candidates, key=lambda c: c[:2])[2]
+
+        return units
+
+    def solve_dispatch(self):
+        project = self.project
+        # storage is installed exactly when the sizing has storage units, which fixes the last binary
+        storage_installed = int(np.any(np.asarray(self.sizing.units) * self.storage_capacity > 0))
+        project.fix_sizing(self.sizing, storage_installed=storage_installed)
+        project.optimize()
+        if not self.solved() and self.with_grid(self.sizing) is not None:
+            self.sizing = self.with_grid(self.sizing)
+            project.fix_sizing(self.sizing, storage_installed=storage_installed)
+            project.optimize()
+
+        return project.solution().objective if self.solved() else None
+
+    def solved(self):
+        # a solution cache hit answers optimize without solving the model
+        return self.project.cached or self.project.model.SolCount > 0
@@ -1,6 +1,10 @@
 from offgridoptimizer import Project, Product, validate_config, one_day_each_month, everyday_one_month, hours_each_month
 from offgridoptimizer.config_schema import get_location_options, get_config_options
-from offgridoptimizer import MONTHS_IN_YEAR, HOURS_IN_DAY, HOURS_IN_YEAR, LEAP_DAY_HOUR, DAYLIGHT_SAVINGS_SPRING, SOMETHING_ELSE
+from offgridoptimizer.registry import location_profile
+from offgridoptimizer.cache import SolutionCache
+from offgridoptimizer.background import BackgroundSolve
+from offgridoptimizer import MONTHS_IN_YEAR, HOURS_IN_DAY, HOURS_IN_YEAR
+from offgridoptimizer.timeindex import HOURS, every_nth_hour
 
 import pathlib
 from jsonschema import ValidationError
@@ -14,12 +18,14 @@ import pickle
 from ipywidgets import Layout, Button, Box, FloatText, Textarea, Dropdown, Label, IntSlider
 from ipywidgets import HTML, Layout, Dropdown, Output, Textarea, VBox, Label
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 colors = px.colors.qualitative.Plotly
+SOLUTION_CACHE = SolutionCache()  # re-optimizing an unchanged config and month selection is answered from disk
 
 month_dict = {'January': 1, 'February': 2, 'March': 3, 'April': 4,
                      'May': 5, 'June': 6, 'July': 7, 'August': 8, 'September': 9,
@@ -205,7 +211,15 @@ class OffGridOptimizer:
                                            align_items='stretch')
         self.btn_optimize.on_click(self.optimize)
 
+        self.btn_cancel = widgets.Button(description='Cancel',
+                                         disabled=True,
+                                         button_style='',
+                                         tooltip='Stop the solve and keep the best solution found so far',
+                                         icon='stop')
+        self.btn_cancel.on_click(self.cancel)
+
         self.error_text = HTML("", layout=Layout(height='auto'))
+        self.progress_text = HTML("", layout=Layout(height='auto'))
 
         # Input Interface
         self.monthly_budget = widgets.FloatText(layout={'width': 'max-content'}, description='monthly_budget: ')
@@ -227,7 +241,8 @@ class OffGridOptimizer:
                                         self.initial_budget], layout=default_layout(border=None))]),
             header("Products"),
             self.product_table.table,
-            widgets.HBox([self.btn_optimize, self.error_text])
+            widgets.HBox([self.btn_optimize, self.btn_cancel, self.error_text]),
+            self.progress_text
         ]
         self.input = interface_box([header("Off-Grid Optimizer"), interface_box(self.input_items)])
 
@@ -241,11 +256,13 @@ class OffGridOptimizer:
         ]
 
         self.output = interface_box(self.output_items)
+        self.plot_output = Output()
 
         # Combined Interface
-        self.interface = interface_box([self.input, self.output])
+        self.interface = interface_box([self.input, self.output, self.plot_output])
 
         self.project = None
+        self.solve = None  # the BackgroundSolve of the last Optimize! click
 
     def load_sheets(self, btn, config=None, hours=None):
         if config:
@@ -308,14 +325,55 @@ class OffGridOptimizer:
         else:
             hours = hours_each_month(months)
 
-        self.project = Project.project_from_config(config, hours=hours)
-        self.project.optimize()
-        labels, costs = zip(*self.project.costs())
+        # the model is built and solved on a worker thread so the notebook stays responsive
+        self.btn_optimize.disabled = True
+        self.btn_cancel.disabled = False
+        self.progress_text.value = "Building model..."
+        self.solve = BackgroundSolve(lambda: Project.project_from_config(config, hours=hours, cache=SOLUTION_CACHE),
+                                     on_progress=self.show_progress,
+                                     on_done=self.show_results,
+                                     on_error=self.show_error).start()
+
+    def cancel(self, btn):
+        if self.solve is not None:
+            self.progress_text.value = "Cancelling..."
+            self.solve.cancel()
+
+    def solve_finished(self):
+        self.btn_optimize.disabled = False
+        self.btn_cancel.disabled = True
+
+    def show_progress(self, progress):
+        self.progress_text.value = progress.text
+
+    def show_error(self, e):
+        self.solve_finished()
+        self.progress_text.value = ""
+        self.error_text.value = f"<h4><font color='red'>{e}<h4>"
+
+    def show_results(self, project):
+        self.solve_finished()
+        self.project = project
+        if not project.cached and project.model.SolCount == 0:
+            self.progress_text.value = "Stopped before any solution was found"
+            return
+
+        if project.cached:
+            self.progress_text.value = "Solved before, results loaded from the cache"
+        elif self.solve.cancelled.is_set():
+            self.progress_text.value = f"Cancelled, showing the best solution found (gap {100 * project.model.MIPGap:.2f}%)"
+        else:
+            self.progress_text.value = f"Solved in {project.model.Runtime:.1f}s"
+
+        labels, costs = zip(*project.costs())
         labels = [text(value) for value in labels]
         costs = widgets.VBox([widgets.FloatText(layout={'width': 'max-content'}, value=value) for value in costs])
         self.output.children = self.output.children[:-1] + tuple([widgets.HBox([widgets.VBox(labels), costs])])
-        self.selected_product_table.update(self.project.selected_products())
-        self.plot_results(self.project.results_df())
+        self.selected_product_table.update(project.selected_products())
+
+        # fig.show() would land in whichever cell is running, the Output widget keeps the plot with the UI
+        self.plot_output.clear_output()
+        self.plot_output.append_display_data(self.results_figure(project.results_df()))
 
     def set_sheet(self, current_sheet):
         easy._last_sheet = current_sheet
@@ -325,6 +383,10 @@ class OffGridOptimizer:
 
     @classmethod
     def plot_results(cls, df, hours=None):
+        cls.results_figure(df, hours).show()
+
+    @classmethod
+    def results_figure(cls, df, hours=None):
         import pandas as pd
         import plotly.express as px
         import plotly.graph_objects as go
@@ -355,15 +417,7 @@ class OffGridOptimizer:
                       secondary_y=False)
 
         if hours:
-            hours = list(range(1, HOURS_IN_YEAR, 4))
-            try:
-                hours.remove(LEAP_DAY_HOUR)
-                hours.remove(DAYLIGHT_SAVINGS_SPRING)
-                hours.remove(SOMETHING_ELSE)
-            except ValueError:
-                pass
-
-            hours = set(list(range(0, HOURS_IN_YEAR))).difference(hours)
+            hours = np.setdiff1d(HOURS, every_nth_hour(4, start=1))
 
             dt_breaks = pd.DataFrame(hours, columns=['chour'])
             df1 = pd.Timestamp('2019-01-01') + pd.to_timedelta(dt_breaks['chour'], unit='H')
@@ -376,7 +430,7 @@ class OffGridOptimizer:
         fig.update_yaxes(title_text="<b>Energy</b> (kWh)", secondary_y=False)
         fig.update_yaxes(title_text="<b>Efficiency</b> (%)", secondary_y=True)
 
-        fig.show()
+        return fig
 
     @classmethod
     def plot_efficiency(cls, df, location='Asheville,NC'):
@@ -415,8 +469,7 @@ class OffGridOptimizer:
                       'May': 5, 'June': 6, 'July': 7, 'August': 8, 'September': 9,
                       'October': 10, 'November': 11, 'December': 12}
         self.location_dropdown.value = location
-        self.load_sheets(None, config=self.sheets_to_config(), hours=[])
-        df = self.project.parameters_df()
+        df = location_profile(location).parameters_df()
 
         fig = make_subplots()
 
@@ -435,8 +488,7 @@ class OffGridOptimizer:
 
     def plot_wind_efficiency_month(self, months=None, location='Asheville,NC'):
         self.location_dropdown.value = location
-        self.load_sheets(None, config=self.sheets_to_config(), hours=[])
-        df = self.project.parameters_df()
+        df = location_profile(location).parameters_df()
 
         fig = make_subplots()
 
@@ -458,8 +510,7 @@ class OffGridOptimizer:
         colors = px.colors.qualitative.Plotly
 
         self.location_dropdown.value = location
-        self.load_sheets(None, config=self.sheets_to_config(), hours=[])
-        df = self.project.parameters_df()
+        df = location_profile(location).parameters_df()
 
         fig = make_subplots()
 
@@ -74,6 +74,10 @@ class Product:
 
 
 class StorageProduct(Product):
+    CUMULATIVE = 'cumulative'  # storage level rebuilt as a running sum every hour
+    STATE_OF_CHARGE = 'soc'    # storage level carried hour to hour by its own decision variable
+    FORMULATIONS = [CUMULATIVE, STATE_OF_CHARGE]
+
     def __init__(self, name: str, utility_type: str, energy_type: str, opening_cost: float, incremental_cost: float,
                  maintenance_cost: float, capacity: List[float], amortization: float):
         super().__init__(name, utility_type, energy_type, opening_cost, incremental_cost,
@@ -81,11 +85,31 @@ class StorageProduct(Product):
         self.b = None  # Excess energy generated per hour
         self.sc = None  # Energy consumed from battery per hour
         self.ss = None
+        self.soc = None  # Energy held in the battery at the end of each hour (state-of-charge formulation only)
+        self.b_mvar = None  # matrix views of b, sc and soc (matrix build only)
+        self.sc_mvar = None
+        self.soc_mvar = None
 
     def init_dvs(self, model, project=None):
         super().init_dvs(model)
+        if project.matrix_build:
+            self.init_mvars(model, project)
+            return
+
         self.b = {hour: model.addVar() for hour in project.hours}  # how much electricity is stored a particular hour
         self.sc = {hour: model.addVar() for hour in project.hours}  # how much electricity is consumed from storage on a particular hour
+        if project.storage_formulation == StorageProduct.STATE_OF_CHARGE:
+            # unbounded below so the feasible region matches the cumulative formulation exactly
+            self.soc = {hour: model.addVar(lb=-gp.GRB.INFINITY) for hour in project.hours}
+
+    def init_mvars(self, model, project):
+        num_hours = len(project.hours)
+        self.b_mvar = model.addMVar(num_hours)
+        self.sc_mvar = model.addMVar(num_hours)
+        self.soc_mvar = model.addMVar(num_hours, lb=-gp.GRB.INFINITY)
+        self.b = dict(zip(project.hours, self.b_mvar.tolist()))
+        self.sc = dict(zip(project.hours, self.sc_mvar.tolist()))
+        self.soc = dict(zip(project.hours, self.soc_mvar.tolist()))
 
     def capacity(self, hour, concretize=False):
         return self.b[hour] if not concretize else self.b[hour].x
@@ -95,3 +119,6 @@ class StorageProduct(Product):
 
     def energy_stored(self, hour, concretize=False):
         return self.b[hour] if not concretize else self.b[hour].x
+
+    def storage_level(self, hour, concretize=False):
+        return self.soc[hour] if not concretize else self.soc[hour].x
@@ -0,0 +1,100 @@
+"""
+Model-build profiler: time, Python allocations and model growth of each phase of building a Project.
+
+Every phase records its wall time, the memory Python allocated during it (net and peak, through
+tracemalloc) and the variables, constraints and nonzeros it added to the model, so each constraint
+family's share of the build shows up as numbers. A phase named parent.child runs inside its parent,
+so it is already part of the parent's numbers and left out of the totals.
+
+    project = Project.project_from_config(config, hours=hours, profile_build=True)
+    print(project.profiler.report())
+"""
+import contextlib
+import time
+import tracemalloc
+
+from tabulate import tabulate
+
+COLUMNS = ['phase', 'seconds', 'alloc_mb', 'peak_mb', 'vars', 'constrs', 'nonzeros']
+
+
+class BuildProfiler:
+    def __init__(self, model, memory=True):
+        """
+        :param memory: trace Python allocations, which slows the build down while it runs
+        """
+        self.model = model
+        self.memory = memory
+        self.phases = []
+        self.peaks = []  # memory peak of each open phase until its latest nested phase reset tracemalloc's
+        self.running = False
+        self.started_tracing = False
+
+    def start(self):
+        self.running = True
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+
+    def stop(self):
+        self.running = False
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def counts(self):
+        # pending additions are only counted once the model is updated
+        self.model.update()
+        return self.model.NumVars, self.model.NumConstrs, self.model.NumNZs
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        # a nested phase ends before its parent, its row is reserved now so it is listed after the parent,
+        # and stays None when the phase raises
+        index = len(self.phases)
+        self.phases.append(None)
+        before = self.counts()
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            if self.peaks:
+                # the peak is reset for this phase, the parent keeps its peak so far
+                self.peaks[-1] = max(self.peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            memory_before, _ = tracemalloc.get_traced_memory()
+            self.peaks.append(memory_before)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            memory_peak = self.peaks.pop() if tracing else None
+
+        seconds = time.perf_counter() - start
+        alloc = peak = None
+        if tracing:
+            memory_after, traced_peak = tracemalloc.get_traced_memory()
+            memory_peak = max(memory_peak, traced_peak)
+            alloc, peak = (memory_after - memory_before) / 2 ** 20, (memory_peak - memory_before) / 2 ** 20
+        after = self.counts()
+        self.phases[index] = dict(zip(COLUMNS, [name, seconds, alloc, peak] +
+                                      [a - b for a, b in zip(after, before)]))
+
+    def totals(self):
+        total = {'phase': 'total'}
+        phases = [phase for phase in self.completed() if '.' not in phase['phase']]
+        for column in COLUMNS[1:]:
+            values = [phase[column] for phase in phases if phase[column] is not None]
+            total[column] = sum(values) if values else None
+        total['peak_mb'] = max((phase['peak_mb'] for phase in phases if phase['peak_mb'] is not None),
+                               default=None)
+        return total
+
+    def completed(self):
+        return [phase for phase in self.phases if phase is not None]
+
+    def rows(self):
+        return self.completed() + [self.totals()]
+
+    def report(self):
+        return tabulate([[row[column] for column in COLUMNS] for row in self.rows()], headers=COLUMNS,
+                        floatfmt='.3f')
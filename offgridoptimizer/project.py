@@ -1,19 +1,42 @@
+import contextlib
 import json
 
+from collections import namedtuple
+from collections.abc import Mapping
 from typing import List
 from . import Product, Grid
-from offgridoptimizer.constraints import DemandConstraint, ProductConstraint, BudgetConstraint
+from offgridoptimizer.product import StorageProduct
+from offgridoptimizer.constraints import DemandConstraint, ProductConstraint, BudgetConstraint, \
+    MatrixDemandConstraint, MatrixProductConstraint
 from offgridoptimizer.config_schema import load_and_validate, validate_config
-from offgridoptimizer.capacity import Capacity
+from offgridoptimizer.registry import location_profile
+from offgridoptimizer.compression import compress_hours
+from offgridoptimizer.solution import Solution
+from offgridoptimizer.cache import project_key
+from offgridoptimizer.catalog import CatalogPresolve
+from offgridoptimizer.profiler import BuildProfiler
 from offgridoptimizer.demand import Demand
+from offgridoptimizer.series import HourlySeries
 
 from tabulate import tabulate
 
 import gurobipy as gp
+import numpy as np
 
-GP_ENV = gp.Env(empty=True)
-# GP_ENV.setParam('LogToConsole', 0)
-GP_ENV.start()
+GP_ENV = None
+
+
+def gurobi_env():
+    """
+    The shared Gurobi environment, started (and the license checked out) by the first Project
+    """
+    global GP_ENV
+    if GP_ENV is None:
+        GP_ENV = gp.Env(empty=True)
+        # GP_ENV.setParam('LogToConsole', 0)
+        GP_ENV.start()
+
+    return GP_ENV
 
 MONTHS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
 
@@ -22,35 +45,142 @@ def list2dict(l):
     return {month + 1: demand for month, demand in enumerate(l)}
 
 
+# sizing decisions of a solved Project, units and opened hold one value per product in Project.products order
+Sizing = namedtuple('Sizing', ['units', 'opened', 'grid_installed'])
+
+
 class Project:
+    EXPRESSION_BUILD = 'expression'  # one addVar / addConstr per hour
+    MATRIX_BUILD = 'matrix'          # hourly variables and constraints added as addMVar / matrix blocks
+    BUILDS = [EXPRESSION_BUILD, MATRIX_BUILD]
+
+    @staticmethod
+    def default_build(storage_formulation):
+        """
+        :return: the matrix build where storage_formulation allows it, the expression build otherwise
+        """
+        if storage_formulation == StorageProduct.STATE_OF_CHARGE:
+            return Project.MATRIX_BUILD
+        return Project.EXPRESSION_BUILD
+
     def __init__(self, product_list, initial_budget,
-                 monthly_budget, location, allow_grid, hours):
-        self.hours = hours
-        self.demand = Demand.from_location(location)
-        self.efficiency = Capacity.from_location(location)
+                 monthly_budget, location, allow_grid, hours, storage_formulation=StorageProduct.CUMULATIVE,
+                 build=EXPRESSION_BUILD, weights=None, compress=False, initial_storage=0, cache=None,
+                 profile_build=False, presolve_catalog=False):
+        if storage_formulation not in StorageProduct.FORMULATIONS:
+            raise ValueError(f'Unknown storage formulation {storage_formulation}, '
+                             f'expected one of {StorageProduct.FORMULATIONS}')
+
+        if build not in Project.BUILDS:
+            raise ValueError(f'Unknown build {build}, expected one of {Project.BUILDS}')
+
+        if build == Project.MATRIX_BUILD and storage_formulation != StorageProduct.STATE_OF_CHARGE:
+            raise ValueError('The matrix build requires the state-of-charge storage formulation')
+
+        self.storage_formulation = storage_formulation
+        self.build = build
+        self.location = location
+        self.profile = location_profile(location)
+        self.demand = self.profile.demand
+        self.efficiency = self.profile.efficiency
+
+        hours = np.asarray(hours, dtype=int)
+        weights = np.ones(len(hours)) if weights is None else np.asarray(weights, dtype=float)
+        if len(weights) != len(hours):
+            raise ValueError('Expected one weight per hour')
+
+        # drop dominated and unaffordable products before any variable is made, see catalog.CatalogPresolve
+        self.catalog = CatalogPresolve(product_list, initial_budget, monthly_budget) if presolve_catalog else None
+        if self.catalog is not None:
+            product_list = self.catalog.kept
+
+        # merge runs of identical hours into single time steps, see compression.compress_hours
+        self.compressed = compress_hours(self.profile, hours, Product.create_products(product_list),
+                                         weights) if compress else None
+        if self.compressed is not None:
+            hours, weights, durations = self.compressed.hours, self.compressed.weights, self.compressed.durations
+        else:
+            durations = np.ones(len(hours), dtype=int)
+
+        self.hours = hours.tolist()
+        # how many hours of the year each modelled hour stands for when costing grid usage and sales
+        self.weights = dict(zip(self.hours, weights.tolist()))
+        # how many consecutive hours each modelled hour spans, more than 1 only for hours merged by compress
+        self.durations = dict(zip(self.hours, durations.tolist()))
+        # energy already held in storage before the first hour, e.g. carried over from an earlier window
+        self.initial_storage = initial_storage
+
+        self.model = gp.Model('Project', env=gurobi_env())
+        self._solution = None  # variable values read after the last optimize, see solution()
+        self.cache = cache  # optional cache.SolutionCache consulted by optimize
+        self.cached = False  # whether the last optimize was answered by the cache rather than the solver
+        self.model_version = 0  # bumped whenever the products change, see expression()
+        self.expressions = {}
+
+        # optional BuildProfiler timing each phase of the build below, see profiler.py
+        self.profiler = BuildProfiler(self.model) if profile_build else None
+        if self.profiler is not None:
+            self.profiler.start()
+        try:
+            self.build_model(product_list, allow_grid, initial_budget, monthly_budget)
+        finally:
+            if self.profiler is not None:
+                self.profiler.stop()
+
+    def build_phase(self, name):
+        # only the initial build is profiled, later edits rebuild constraints outside of any phase
+        if self.profiler is not None and self.profiler.running:
+            return self.profiler.phase(name)
+        return contextlib.nullcontext()
+
+    def build_model(self, product_list, allow_grid, initial_budget, monthly_budget):
+        self.initial_budget = initial_budget
+        self.monthly_budget = monthly_budget
 
-        self.model = gp.Model('Project', env=GP_ENV)
+        with self.build_phase('variables'):
+            if self.matrix_build:
+                self.ss_mvar = self.model.addMVar(len(self.hours))
+                self.ss = dict(zip(self.hours, self.ss_mvar.tolist()))  # Energy sold
+            else:
+                self.ss = {hour: self.model.addVar() for hour in self.hours}  # Energy sold
+            self.storage_installed = self.model.addVar(vtype=gp.GRB.BINARY)
 
-        self.ss = {hour: self.model.addVar() for hour in self.hours}  # Energy sold
-        self.storage_installed = self.model.addVar(vtype=gp.GRB.BINARY)
+        with self.build_phase('grid'):
+            self.grid = Grid(project=self, hourly_grid=self.profile.hourly_grid, allow_grid=allow_grid,
+                             model=self.model)
 
-        self.grid = Grid.from_location(location, allow_grid, model=self.model, project=self)
+        with self.build_phase('products'):
+            self.products = Product.create_products(product_list, model=self.model, project=self)
 
-        self.products = Product.create_products(product_list, model=self.model, project=self)
-        self.product_constraint = ProductConstraint(self)
+        with self.build_phase('product_constraints'):
+            if self.matrix_build:
+                self.product_constraint = MatrixProductConstraint(self)
+            else:
+                self.product_constraint = ProductConstraint(self)
 
-        self.initial_budget = initial_budget
-        self.monthly_budget = monthly_budget
+        with self.build_phase('budget_constraints'):
+            self.budget_constraint = BudgetConstraint(self)
 
-        self.budget_constraint = BudgetConstraint(self)
+        with self.build_phase('demand_constraints'):
+            if self.matrix_build:
+                self.demand_constraint = MatrixDemandConstraint(self)
+            else:
+                self.demand_constraint = DemandConstraint(self)
 
-        self.demand_constraint = DemandConstraint(self)
+        with self.build_phase('objective'):
+            self.set_objective()
 
-        self.set_objective()
+    @property
+    def matrix_build(self):
+        return self.build == Project.MATRIX_BUILD
 
     def products_by_type(self, energy_type):
         return [product for product in self.products if product.et == energy_type]
 
+    def generation_products(self):
+        return [product for product in self.products
+                if product.ut == Product.ELEC and product.et != Product.STORAGE]
+
     #################
     # Project Costs #
     #################
@@ -68,7 +198,10 @@ class Project:
         return sum((product.y if not concretize else product.y.x) * product.ic for product in self.products)
 
     def total_revenue(self, concretize=False):
-        return sum([self.grid.hourly_grid_sale[hour] * self.energy_sold(hour, concretize)
+        if self.matrix_build and not concretize:
+            return gp.LinExpr((self.sale_price_array() * self.weight_array()).tolist(), self.ss_mvar.tolist())
+
+        return sum([self.grid.hourly_grid_sale[hour] * self.weights[hour] * self.energy_sold(hour, concretize)
              for hour in self.hours])
 
     def capital_costs(self, concretize=False):
@@ -86,48 +219,48 @@ class Project:
     ####################
     @property
     def hourly_capacity(self):
-        z = {}
-        for h in self.hours:
-            z[h] = self.electricity_capacity(h, True)
-
-        return z
+        return self.solution().hourly(self.solution().capacity)
 
     @property
     def hourly_storage_level(self):
-        z = {}
-        times = []
-        for hour in self.hours:
-            z[hour] = sum(self.energy_stored(h, True) for h in times) - \
-                        sum(self.storage_consumed(h, True) for h in times)# - \
-                          #sum(self.energy_sold(h, True) for h in times)
-            times.append(hour)
-
-        return z
+        # storage level at the start of each hour
+        return self.solution().hourly(self.solution().storage_level)
 
     @property
     def hourly_grid_usage(self):
-        z = {}
-        for h in self.hours:
-            z[h] = self.grid_capacity(h, True)
-
-        return z
+        return self.solution().hourly(self.solution().grid_usage)
 
     @property
     def hourly_energy_sold(self):
-        z = {}
-        for h in self.hours:
-            z[h] = self.energy_sold(h, True)
-
-        return z
+        return self.solution().hourly(self.solution().energy_sold)
 
     def energy_stored(self, hour, concretize=False):
+        if not concretize:
+            return self.expression('energy_stored', hour)
+
         return sum(product.energy_stored(hour=hour, concretize=concretize)
                    for product in self.products if product.et == Product.STORAGE)
 
     def storage_consumed(self, hour, concretize=False):
+        if not concretize:
+            return self.expression('storage_consumed', hour)
+
         return sum(product.storage_consumed(hour=hour, concretize=concretize)
                    for product in self.products if product.et == Product.STORAGE)
 
+    def storage_level(self, hour, concretize=False):
+        if not concretize:
+            return self.expression('storage_level', hour)
+
+        return self.initial_storage + sum(product.storage_level(hour=hour, concretize=concretize)
+                                          for product in self.products if product.et == Product.STORAGE)
+
+    def final_storage_level(self):
+        """
+        Energy left in storage at the end of the last hour of a solved Project
+        """
+        return float(self.solution().storage_after[-1])
+
     def energy_sold(self, hour, concretize=False):
         return self.ss[hour] if not concretize else self.ss[hour].x
 
@@ -140,8 +273,53 @@ class Project:
             return sum(product.y.x * product.ca * self.efficiency.lookup(hour, product.et)
                    for product in self.products if product.ut == Product.ELEC and product.et != Product.STORAGE)
         else:
-            return sum(product.y * product.ca * self.efficiency.lookup(hour, product.et)
-                       for product in self.products if product.ut == Product.ELEC and product.et != Product.STORAGE)
+            return self.expression('electricity_capacity', hour)
+
+    ######################
+    # Hourly Expressions #
+    ######################
+
+    def expression(self, name, hour):
+        """
+        Per-hour expression of the current model version
+
+        The first use of name builds it for every hour at once with build_<name>, later uses are lookups.
+        The expression is shared by every constraint that uses it, so it must not be modified in place.
+        """
+        expressions = self.expressions.get(name)
+        if expressions is None:
+            expressions = self.expressions[name] = getattr(self, f'build_{name}')()
+
+        return expressions[hour]
+
+    def invalidate_expressions(self):
+        self.model_version += 1
+        self.expressions = {}
+
+    def build_electricity_capacity(self):
+        products = self.generation_products()
+        units = [product.y for product in products]
+        return {hour: gp.LinExpr(row, units)
+                for hour, row in zip(self.hours, self.efficiency_matrix(products).tolist())}
+
+    def build_energy_stored(self):
+        return self.storage_sums('b')
+
+    def build_storage_consumed(self):
+        return self.storage_sums('sc')
+
+    def build_storage_level(self):
+        levels = self.storage_sums('soc')
+        if self.initial_storage:
+            for level in levels.values():
+                level.addConstant(self.initial_storage)
+
+        return levels
+
+    def storage_sums(self, attribute):
+        variables = [getattr(product, attribute) for product in self.products_by_type(Product.STORAGE)]
+        ones = [1.0] * len(variables)
+        return {hour: gp.LinExpr(ones, [v[hour] for v in variables]) for hour in self.hours}
 
     def heat_capacity(self, hour):
         return self._capacity(hour, Product.HEAT)
@@ -159,6 +337,48 @@ class Project:
     def heat_demand(self, hour):
         pass
 
+    #################
+    # Hourly Arrays #
+    #################
+
+    def duration_array(self):
+        return np.fromiter(self.durations.values(), dtype=int, count=len(self.durations))
+
+    def weight_array(self):
+        return np.fromiter(self.weights.values(), dtype=float, count=len(self.weights))
+
+    def demand_array(self):
+        return self.demand.hourly_demand.take(self.hours)
+
+    def sale_price_array(self):
+        return self.grid.hourly_grid_sale.take(self.hours)
+
+    def grid_price_array(self):
+        return self.grid.hourly_grid.take(self.hours)
+
+    def efficiency_matrix(self, products):
+        columns = [product.ca * self.efficiency.series(product.et).take(self.hours) for product in products]
+        return np.column_stack(columns) if columns else np.zeros((len(self.hours), 0))
+
+    def electricity_capacity_mvar(self):
+        products = self.generation_products()
+        if not products:
+            return gp.MLinExpr.zeros(len(self.hours))
+
+        return self.efficiency_matrix(products) @ gp.MVar.fromlist([product.y for product in products])
+
+    def energy_stored_mvar(self):
+        return sum((product.b_mvar for product in self.products_by_type(Product.STORAGE)),
+                   gp.MLinExpr.zeros(len(self.hours)))
+
+    def storage_consumed_mvar(self):
+        return sum((product.sc_mvar for product in self.products_by_type(Product.STORAGE)),
+                   gp.MLinExpr.zeros(len(self.hours)))
+
+    def storage_level_mvar(self):
+        return sum((product.soc_mvar for product in self.products_by_type(Product.STORAGE)),
+                   gp.MLinExpr.zeros(len(self.hours))) + self.initial_storage
+
     # def elec_capacity_by_month(self, month):
     #     return self._capacity_by_month(month, Product.ELEC)
     #
@@ -172,25 +392,89 @@ class Project:
     # Project Constraints #
     #######################
 
-    def set_demand_constraints(self, electricity_demand, heat_demand):
-        self.monthly_electricity_demand = electricity_demand
-        self.monthly_heat_demand = heat_demand
-        self.demand_constraint.update_constraints()
-        self.set_objective()
+    # the set_* edits below change the model in place and offer the last solution as a MIP start,
+    # so a what-if re-solve starts from where the previous one ended
+
+    def set_demand_constraints(self, electricity_demand, heat_demand=None):
+        """
+        Replace the electricity demand of the modelled hours, only right hand sides change
+
+        :param electricity_demand: one value per hour in self.hours, or a mapping of hour to demand
+        """
+        if self.compressed is not None:
+            raise ValueError('The steps of a compressed Project depend on its demand, build a new Project instead')
+
+        if isinstance(electricity_demand, Mapping):
+            electricity_demand = [electricity_demand[hour] for hour in self.hours]
+        new = np.asarray(electricity_demand, dtype=float)
+        if new.shape != (len(self.hours),):
+            raise ValueError(f'Expected {len(self.hours)} demand values, got {new.shape}')
+
+        start = self.last_solution_values()
+        delta = new - self.demand_array()
+        demand = self.demand.hourly_demand.array.copy()
+        demand[self.hours] = new
+        self.demand = Demand(hourly_demand=HourlySeries(demand))
+
+        for constraint in [self.demand_constraint, self.product_constraint]:
+            constraint.shift_demand(delta)
+        self.product_constraint.update_bounds()
+        self.set_start(start)
 
     def set_product_constraints(self, new_products, grid=None):
         self.products = new_products
         if grid:
             self.grid = grid
 
+        self.invalidate_expressions()
+        self.demand_constraint.update_constraints()
         self.product_constraint.update_constraints()
+        self.budget_constraint.update_constraints()
         self.set_objective()
 
     def set_budget_constraints(self, initial_budget, monthly_budget):
+        if self.catalog is not None and self.catalog.dropped and \
+                (initial_budget > self.catalog.initial_budget or monthly_budget > self.catalog.monthly_budget):
+            raise ValueError('Products dropped by the catalog presolve may fit a larger budget, '
+                             'build a new Project instead')
+
+        start = self.last_solution_values()
         self.initial_budget = initial_budget
         self.monthly_budget = monthly_budget
-        self.budget_constraint.update_constraints()
-        self.set_objective()
+        self.budget_constraint.update_budget(initial_budget, monthly_budget)
+        self.product_constraint.update_bounds()
+        self.set_start(start)
+
+    def set_product_costs(self, product, opening_cost=None, incremental_cost=None, maintenance_cost=None):
+        """
+        Change the costs of one product, only objective and budget coefficients change
+        """
+        if self.catalog is not None and self.catalog.dropped:
+            raise ValueError('Products dropped by the catalog presolve may be worth modelling at other costs, '
+                             'build a new Project instead')
+
+        start = self.last_solution_values()
+        product.oc = product.oc if opening_cost is None else opening_cost
+        product.ic = product.ic if incremental_cost is None else incremental_cost
+        product.mc = product.mc if maintenance_cost is None else maintenance_cost
+
+        # the opening cost is the only objective term of x, maintenance and incremental costs those of y
+        product.x.Obj = product.oc
+        product.y.Obj = product.mc + product.ic
+        self.budget_constraint.update_product_costs(product)
+        self.product_constraint.update_bounds()
+        self.set_start(start)
+
+    def last_solution_values(self):
+        # values have to be read before an edit, the model drops its solution once the edit is applied
+        if self.model.SolCount == 0:
+            return None
+
+        return self.model.getAttr('X', self.model.getVars())
+
+    def set_start(self, values):
+        if values is not None:
+            self.model.setAttr('Start', self.model.getVars(), values)
 
     #####################
     # Project Objective #
@@ -209,13 +493,57 @@ class Project:
         #                                (1 - self.grid.grid_installed) * self.total_revenue() +
         #                                self.grid.artificial_total_grid_cost(), gp.GRB.MINIMIZE)
 
-    def optimize(self):
-        self.model.optimize()
+    def optimize(self, callback=None, telemetry=None):
+        """
+        :param callback: optional Gurobi callback, callback(model, where), e.g. to report progress or terminate
+        :param telemetry: optional telemetry.SolveTelemetry recording progress events and final statistics
+        """
+        self._solution = None
+        self.cached = False
+        key = project_key(self) if self.cache is not None else None
+        if key is not None:
+            self._solution = self.cache.get(key, self)
+            self.cached = self._solution is not None
+
+        if not self.cached:
+            self.model.optimize(self.combined_callback(callback, telemetry))
+            if key is not None and self.model.Status == gp.GRB.OPTIMAL:
+                self.cache.put(key, self.solution())
+
+        if telemetry is not None:
+            telemetry.finish(self)
+
+    @classmethod
+    def combined_callback(cls, callback, telemetry):
+        if telemetry is None:
+            return callback
+
+        def combined(model, where):
+            telemetry.callback(model, where)
+            if callback is not None:
+                callback(model, where)
+
+        return combined
+
+    @property
+    def status(self):
+        # a cached solution was optimal when it was stored, the model itself was never solved
+        return gp.GRB.OPTIMAL if self.cached else self.model.Status
+
+    def solution(self):
+        """
+        Every variable value of the last optimize, read once in bulk
+
+        :return: Solution
+        """
+        if self._solution is None:
+            self._solution = Solution.from_model(self)
+
+        return self._solution
 
     def print_results(self):
         headers = ['Product Name', 'Quantity']
-        selected_products = tabulate([(p.name, p.y.x) for p in self.products] +
-                                     [("grid", sum(hour.x for hour in self.grid.hourly_usage.values()))], headers=headers)
+        selected_products = tabulate(self.selected_products(), headers=headers)
         print(selected_products)
 
         print('\n\n')
@@ -226,34 +554,48 @@ class Project:
         print(final_costs)
 
     def costs(self):
-        toc = self.total_opening_cost(concretize=True)
-        tmc = self.total_maintenance_cost(concretize=True)
-        tic = self.total_incremental_cost(concretize=True)
-        tgc = self.grid.actual_total_grid_cost(concretize=True)
-        tr = self.total_revenue(concretize=True)
-        return (("Total Opening Cost", toc),
-             ("Total Maintenance Cost", tmc),
-             ("Total Incremental Cost", tic),
-             ("Total Grid Cost", tgc),
-             ("Total Revenue", tr),
-             ("Total Cost", toc + tmc + tic + tgc - tr))
+        return self.solution().costs()
 
     def cost_labels(self):
         return ("Total Opening Cost", "Total Maintenance Cost",
                 "Total Incremental Cost", "Total Grid Cost", "Total Revenue", "Total Cost")
 
+    def sizing(self):
+        solution = self.solution()
+        return Sizing(units=np.rint(solution.units).astype(int).tolist(),
+                      opened=np.rint(solution.opened).astype(int).tolist(),
+                      grid_installed=int(round(solution.grid_installed)))
+
+    def fix_sizing(self, sizing, storage_installed=None):
+        """
+        Fix every sizing decision so only the hourly dispatch is left to optimize
+
+        :param sizing: Sizing, e.g. from another Project over the same products
+        :param storage_installed: also fix storage_installed, which carries no cost and is left free by default
+        """
+        if len(sizing.units) != len(self.products):
+            raise ValueError(f'Expected a sizing of {len(self.products)} products, got {len(sizing.units)}')
+
+        for product, units, opened in zip(self.products, sizing.units, sizing.opened):
+            product.y.LB = product.y.UB = units
+            product.x.LB = product.x.UB = opened
+        self.grid.grid_installed.LB = self.grid.grid_installed.UB = sizing.grid_installed
+        if storage_installed is not None:
+            self.storage_installed.LB = self.storage_installed.UB = storage_installed
+
     def selected_products(self):
-        return [(p.name, p.y.x) for p in self.products] + \
-        [("grid", sum(hour.x for hour in self.grid.hourly_usage.values()))]
+        solution = self.solution()
+        return [(p.name, units) for p, units in zip(self.products, solution.units.tolist())] + \
+            [("grid", float(solution.grid_usage.sum()))]
 
     @classmethod
-    def project_from_config_path(cls, config_path, hours):
+    def project_from_config_path(cls, config_path, hours, **kwargs):
         config = load_and_validate(config_path)
 
-        return Project.project_from_config(config, hours, validate=False)
+        return Project.project_from_config(config, hours, validate=False, **kwargs)
 
     @classmethod
-    def project_from_config(cls, config, hours, validate=True):
+    def project_from_config(cls, config, hours, validate=True, **kwargs):
         if validate:
             validate_config(config)
 
@@ -263,44 +605,11 @@ class Project:
                        monthly_budget=budget['monthly'],
                        location=config['location'],
                        allow_grid=config['allow_grid'],
-                       hours=hours)
+                       hours=hours,
+                       **kwargs)
 
     def results_df(self):
-        import pandas as pd
-        from functools import reduce
-
-        def dict2pd(arg):
-            d, col = arg
-            return pd.Series(d).rename_axis(['hour']).reset_index(name=col)
-
-        data = [(self.demand.hourly_demand, 'demand'),
-                (self.efficiency.hourly_solar_capacity, 'pv_efficiency'),
-                (self.efficiency.hourly_wind_capacity, 'wind_efficiency'),
-                (self.hourly_capacity, 'capacity'),
-                (self.hourly_storage_level, 'storage_level'),
-                (self.hourly_energy_sold, 'energy_sold'),
-                (self.hourly_grid_usage, 'grid_usage')]
-
-        tdata = map(dict2pd, data)
-        df = reduce(lambda df1, df2: pd.merge(df1, df2), tdata)
-        df['date'] = pd.Timestamp('2019-01-01') + pd.to_timedelta(df['hour'], unit='H')
-        return df
+        return self.solution().results_df()
 
     def parameters_df(self):
-        import pandas as pd
-        from functools import reduce
-
-        def dict2pd(arg):
-            d, col = arg
-            return pd.Series(d).rename_axis(['hour']).reset_index(name=col)
-
-        data = [(self.demand.hourly_demand, 'demand'),
-                (self.efficiency.hourly_solar_capacity, 'pv_efficiency'),
-                (self.efficiency.hourly_wind_capacity, 'wind_efficiency')]
-
-        tdata = map(dict2pd, data)
-        df = reduce(lambda df1, df2: pd.merge(df1, df2), tdata)
-        df['date'] = pd.Timestamp('2019-01-01') + pd.to_timedelta(df['hour'], unit='H')
-        return df
-
-
+        return self.profile.parameters_df()
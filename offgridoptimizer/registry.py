@@ -0,0 +1,105 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+from offgridoptimizer.capacity import Capacity
+from offgridoptimizer.demand import Demand
+from offgridoptimizer.grid import Grid
+from offgridoptimizer.series import HourlySeries
+from offgridoptimizer.timeindex import align
+
+
+class LocationProfile(namedtuple('LocationProfile', ['location', 'demand', 'efficiency', 'hourly_grid'])):
+    """
+    Demand, solar/wind efficiency and grid prices for one location.
+
+    Profiles are shared by every Project built for the same location, so the series they hold are read-only.
+    """
+    __slots__ = ()
+
+    def parameters_df(self):
+        import pandas as pd
+        from functools import reduce
+
+        def dict2pd(arg):
+            d, col = arg
+            return pd.Series(d).rename_axis(['hour']).reset_index(name=col)
+
+        data = [(self.demand.hourly_demand, 'demand'),
+                (self.efficiency.hourly_solar_capacity, 'pv_efficiency'),
+                (self.efficiency.hourly_wind_capacity, 'wind_efficiency')]
+
+        tdata = map(dict2pd, data)
+        df = reduce(lambda df1, df2: pd.merge(df1, df2), tdata)
+        df['date'] = pd.Timestamp('2019-01-01') + pd.to_timedelta(df['hour'], unit='H')
+        return df
+
+
+def aligned(series):
+    array = align(series.array)
+    array.flags.writeable = False
+    return HourlySeries(array)
+
+
+class LocationRegistry:
+    """
+    Process-wide LRU cache of LocationProfiles keyed by location name.
+
+    hits and misses count lookups so reuse can be confirmed, see info().
+    """
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self.profiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def key(cls, location):
+        return location.replace(",", "_").lower()
+
+    def get(self, location):
+        key = LocationRegistry.key(location)
+        with self.lock:
+            if key in self.profiles:
+                self.hits += 1
+                self.profiles.move_to_end(key)
+                return self.profiles[key]
+
+            self.misses += 1
+
+        profile = LocationRegistry.load(location)
+        with self.lock:
+            self.profiles[key] = profile
+            self.profiles.move_to_end(key)
+            while len(self.profiles) > self.maxsize:
+                self.profiles.popitem(last=False)
+
+        return profile
+
+    @classmethod
+    def load(cls, location):
+        # all four series are aligned to the same gap-free hourly index, see timeindex.align
+        demand = Demand.from_location(location)
+        efficiency = Capacity.from_location(location)
+        demand = Demand(hourly_demand=aligned(demand.hourly_demand))
+        efficiency = Capacity(hourly_solar_capacity=aligned(efficiency.hourly_solar_capacity),
+                              hourly_wind_capacity=aligned(efficiency.hourly_wind_capacity))
+        hourly_grid = aligned(Grid.prices_from_csv(Grid.grid_path(location)))
+        return LocationProfile(location=location, demand=demand, efficiency=efficiency, hourly_grid=hourly_grid)
+
+    def info(self):
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.profiles), 'maxsize': self.maxsize}
+
+    def clear(self):
+        with self.lock:
+            self.profiles.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+LOCATIONS = LocationRegistry()
+
+
+def location_profile(location):
+    return LOCATIONS.get(location)
@@ -0,0 +1,142 @@
+"""
+Rolling-horizon dispatch: solve the hourly operation of a fixed sizing over overlapping windows.
+
+Every window is a small Project with its sizing fixed. Only the first `window - overlap` hours of a
+window are kept, the overlap lets the storage look ahead before handing its level on to the next
+window. Windows are solved and disposed one at a time, so the model in memory never grows beyond
+one window however long the horizon is.
+"""
+import numpy as np
+
+from offgridoptimizer import HOURS_IN_DAY
+from offgridoptimizer.aggregation import representative_project
+from offgridoptimizer.project import Project
+from offgridoptimizer.registry import location_profile
+from offgridoptimizer.solution import Solution
+from offgridoptimizer.timeindex import HOURS
+
+import gurobipy as gp
+
+WEEK = 7 * HOURS_IN_DAY
+
+
+def windows(hours, window=WEEK, overlap=HOURS_IN_DAY):
+    """
+    Split hours into overlapping windows
+
+    :return: list of (window_hours, kept) where kept is the number of leading hours of the window
+             that belong to it, the rest are solved again by the next window
+    """
+    if not 0 <= overlap < window:
+        raise ValueError(f'Expected 0 <= overlap < window, got overlap {overlap} and window {window}')
+
+    hours = np.asarray(hours, dtype=int)
+    if len(hours) == 0:
+        raise ValueError('Expected at least one hour to split into windows')
+    step = window - overlap
+    splits = []
+    for start in range(0, len(hours), step):
+        window_hours = hours[start:start + window]
+        last = start + window >= len(hours)
+        splits.append((window_hours, len(window_hours) if last else step))
+        if last:
+            break
+
+    return splits
+
+
+class RollingHorizon:
+    def __init__(self, config, sizing, window=WEEK, overlap=HOURS_IN_DAY, validate=True, **kwargs):
+        """
+        :param config: Project config, as for Project.project_from_config
+        :param sizing: Sizing every window is fixed to, see Project.sizing
+        :param kwargs: passed to every window Project, e.g. storage_formulation and build
+        """
+        if kwargs.get('compress'):
+            raise ValueError('Rolling-horizon windows are solved hour by hour and cannot be compressed')
+
+        self.config = config
+        self.sizing = sizing
+        self.window = window
+        self.overlap = overlap
+        self.validate = validate
+        self.kwargs = kwargs
+        self.frames = []
+        self.sizing_costs = None
+        self.runtime = 0
+
+    @classmethod
+    def from_representative_days(cls, config, k=12, window=WEEK, overlap=HOURS_IN_DAY, **kwargs):
+        """
+        Size config over k representative days, see aggregation.representative_project,
+        and dispatch that sizing over rolling windows
+        """
+        project, _ = representative_project(config, k, **kwargs)
+        project.optimize()
+        sizing = project.sizing()
+        project.model.dispose()
+        return RollingHorizon(config, sizing, window=window, overlap=overlap, validate=False, **kwargs)
+
+    def window_results(self, hours=HOURS):
+        """
+        Solve every window in turn
+
+        :return: generator of the results_df rows each window keeps
+        """
+        storage = 0
+        for window_hours, kept in windows(hours, self.window, self.overlap):
+            project = Project.project_from_config(self.config, hours=window_hours, validate=self.validate,
+                                                  initial_storage=storage, **self.kwargs)
+            project.fix_sizing(self.sizing)
+            project.optimize()
+            if project.status != gp.GRB.OPTIMAL:
+                raise RuntimeError(f'Window starting at hour {window_hours[0]} ended with status '
+                                   f'{project.status}, the fixed sizing cannot serve it')
+
+            if self.sizing_costs is None:
+                self.sizing_costs = project.costs()[:3]
+
+            self.runtime += 0 if project.cached else project.model.Runtime
+            df = project.results_df()
+            df = df[df.hour.isin(window_hours[:kept])].reset_index(drop=True)
+            storage = self.kept_storage_level(project, window_hours, kept)
+            project.model.dispose()
+            yield df
+
+    @classmethod
+    def kept_storage_level(cls, project, window_hours, kept):
+        if kept < len(window_hours):
+            return project.hourly_storage_level[int(window_hours[kept])]
+
+        return project.final_storage_level()
+
+    def solve(self, hours=HOURS):
+        self.frames = list(self.window_results(hours))
+        return self
+
+    def results_df(self):
+        """
+        Rows every window kept, an empty frame with the same columns before any window was solved
+        """
+        import pandas as pd
+
+        if not self.frames:
+            return pd.DataFrame(columns=Solution.RESULT_COLUMNS)
+
+        return pd.concat(self.frames, ignore_index=True)
+
+    def costs(self):
+        """
+        Same cost breakdown as Project.costs, over every kept hour of every window
+        """
+        df = self.results_df()
+        prices = location_profile(self.config['location']).hourly_grid.take(df.hour.to_numpy())
+        grid_cost = float(df.grid_usage.to_numpy() @ prices)
+        revenue = float(df.energy_sold.to_numpy() @ prices)
+        (_, toc), (_, tmc), (_, tic) = self.sizing_costs
+        return (("Total Opening Cost", toc),
+                ("Total Maintenance Cost", tmc),
+                ("Total Incremental Cost", tic),
+                ("Total Grid Cost", grid_cost),
+                ("Total Revenue", revenue),
+                ("Total Cost", toc + tmc + tic + grid_cost - revenue))
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import pathlib
+from collections.abc import Mapping
+
+import numpy as np
+
+from offgridoptimizer import HOURS_IN_YEAR
+
+CACHE_DIR_ENV = 'OFFGRIDOPTIMIZER_CACHE_DIR'
+CACHE_VERSION = 1
+
+FIELD_WIDTHS = {'%Y': 4, '%m': 2, '%d': 2, '%H': 2, '%M': 2}
+DAYS_BEFORE_MONTH = np.array([0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334])
+
+
+class HourlySeries(Mapping):
+    """
+    Read-only mapping of hour of year -> value backed by a dense array.
+
+    Hours missing from the source data are stored as NaN and behave like missing dict keys,
+    so a series can be used anywhere the old {hour: value} dicts were.
+    """
+    def __init__(self, array):
+        self.array = array
+
+    def __getitem__(self, hour):
+        if 0 <= hour < len(self.array):
+            value = self.array[hour]
+            if value == value:  # NaN marks an hour missing from the source data
+                return float(value)
+
+        raise KeyError(hour)
+
+    def __iter__(self):
+        return iter(np.flatnonzero(~np.isnan(self.array)).tolist())
+
+    def __len__(self):
+        return int(np.count_nonzero(~np.isnan(self.array)))
+
+    def __contains__(self, hour):
+        return 0 <= hour < len(self.array) and not np.isnan(self.array[hour])
+
+    def take(self, hours):
+        """
+        Values for many hours at once
+
+        :param hours: sequence of hours of the year
+        :return: a float array aligned with hours
+        """
+        hours = np.asarray(hours, dtype=int)
+        # like __getitem__, an hour outside the year is missing rather than indexed from the end
+        outside = (hours < 0) | (hours >= len(self.array))
+        if outside.any():
+            raise KeyError(hours[outside][0])
+
+        values = self.array[hours]
+        if np.isnan(values).any():
+            raise KeyError(hours[np.isnan(values)][0])
+
+        return values
+
+    def scale(self, factor):
+        return HourlySeries(self.array * factor)
+
+    @classmethod
+    def from_dict(cls, hourly):
+        return HourlySeries.from_hours(np.fromiter(hourly.keys(), dtype=int, count=len(hourly)),
+                                       np.fromiter(hourly.values(), dtype=float, count=len(hourly)))
+
+    @classmethod
+    def from_hours(cls, hours, values):
+        """
+        Dense series from parallel arrays of hours and values, later rows win when an hour repeats
+        (e.g. the repeated hour when daylight savings ends), matching the old dict comprehensions.
+        """
+        size = max(HOURS_IN_YEAR, int(hours.max(initial=-1)) + 1)
+        array = np.full(size, np.nan)
+        unique_hours, last = np.unique(hours[::-1], return_index=True)
+        array[unique_hours] = values[::-1][last]
+        return HourlySeries(array)
+
+
+def field_slices(fmt):
+    """
+    Character positions of each field in a zero-padded, fixed width timestamp format
+
+    :return: (slices, width) with slices a dict of field to its slice, e.g. "%m-%d-%Y %H:%M" ->
+        ({'%m': slice(0, 2), '%d': slice(3, 5), '%Y': slice(6, 10), ...}, 16), and width the length
+        of a formatted timestamp
+    """
+    slices = {}
+    position = 0
+    idx = 0
+    while idx < len(fmt):
+        if fmt[idx] == '%':
+            field = fmt[idx:idx + 2]
+            if field not in FIELD_WIDTHS:
+                raise ValueError(f'Unsupported field {field} in timestamp format {fmt}')
+            slices[field] = slice(position, position + FIELD_WIDTHS[field])
+            position += FIELD_WIDTHS[field]
+            idx += 2
+        else:
+            position += 1
+            idx += 1
+
+    return slices, position
+
+
+def hours_of_year(timestamps, fmt):
+    """
+    Vectorized equivalent of hour_of_year(convert_time(row, fmt)) for a whole column of timestamps
+
+    :param timestamps: numpy bytes array of timestamps
+    :param fmt: fixed width strptime format made of %Y, %m, %d, %H and %M
+    :return: int array of hours since the start of each timestamp's year
+    """
+    slices, width = field_slices(fmt)
+    timestamps = np.ascontiguousarray(timestamps, dtype=f'S{width}')
+    digits = timestamps.view(np.uint8).reshape(len(timestamps), width).astype(int) - ord('0')
+
+    def field(name):
+        columns = digits[:, slices[name]]
+        return columns @ (10 ** np.arange(columns.shape[1] - 1, -1, -1))
+
+    year, month, day, hour = field('%Y'), field('%m'), field('%d'), field('%H')
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    day_of_year = DAYS_BEFORE_MONTH[month - 1] + (leap & (month > 2)) + day - 1
+    return day_of_year * 24 + hour
+
+
+def read_hourly_csv(path, column, fmt):
+    """
+    Read the local_time and value columns of an hourly csv in bulk
+
+    :return: HourlySeries aligned to hour of year
+    """
+    with open(path) as fp:
+        for header_line, line in enumerate(fp):
+            if not line.startswith('#'):
+                header = line.strip().split(',')
+                break
+
+    slices, width = field_slices(fmt)
+    table = np.loadtxt(path, delimiter=',', skiprows=header_line + 1, ndmin=1,
+                       usecols=(header.index('local_time'), header.index(column)),
+                       dtype=[('local_time', f'S{width}'), ('value', float)])
+
+    return HourlySeries.from_hours(hours_of_year(table['local_time'], fmt), table['value'])
+
+
+def cache_dir():
+    default = pathlib.Path(__file__).parent.parent / 'data' / '.cache'
+    return pathlib.Path(os.environ.get(CACHE_DIR_ENV, default))
+
+
+def file_digest(path):
+    with open(path, 'rb') as fp:
+        return hashlib.sha256(fp.read()).hexdigest()
+
+
+def load_series(path, column, fmt):
+    """
+    Load one column of an hourly csv, going through a memory-mapped .npy cache.
+
+    The cache entry is rebuilt when the source file's contents change. The modification time and size
+    are checked first so an unchanged file is never re-read; when only those differ the file is hashed
+    before deciding to re-parse it.
+
+    :param path: path to the source csv
+    :param column: name of the value column
+    :param fmt: strptime format of the local_time column
+    :return: HourlySeries
+    """
+    path = pathlib.Path(path)
+    stat = path.stat()
+    directory = cache_dir()
+    name = f'{path.parent.name}_{path.stem}_{column}'
+    array_path = directory / f'{name}.npy'
+    meta_path = directory / f'{name}.json'
+
+    try:
+        with open(meta_path) as fp:
+            meta = json.load(fp)
+    except (OSError, ValueError):
+        meta = {}
+
+    fresh = meta.get('version') == CACHE_VERSION and meta.get('source') == str(path.resolve()) and \
+        array_path.exists()
+
+    if fresh and (meta.get('mtime_ns'), meta.get('size')) != (stat.st_mtime_ns, stat.st_size):
+        digest = file_digest(path)
+        fresh = meta.get('sha256') == digest
+        if fresh:
+            write_meta(meta_path, path, stat, digest)
+
+    if fresh:
+        return HourlySeries(np.load(array_path, mmap_mode='r'))
+
+    values = read_hourly_csv(path, column, fmt).array
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = directory / f'{name}.{os.getpid()}.tmp.npy'
+        np.save(tmp_path, values)
+        os.replace(tmp_path, array_path)
+        write_meta(meta_path, path, stat, file_digest(path))
+    except OSError:
+        # a read-only checkout still works, it just parses the csv every time
+        return HourlySeries(values)
+
+    return HourlySeries(np.load(array_path, mmap_mode='r'))
+
+
+def write_meta(meta_path, path, stat, digest):
+    tmp_path = meta_path.with_suffix(f'.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as fp:
+        json.dump({'version': CACHE_VERSION, 'source': str(path.resolve()), 'mtime_ns': stat.st_mtime_ns,
+                   'size': stat.st_size, 'sha256': digest}, fp)
+    os.replace(tmp_path, meta_path)
@@ -0,0 +1,111 @@
+"""
+Solution extraction: every variable value of a solved Project read in one getAttr call.
+
+Per-hour values are NumPy arrays in Project.hours order, so reporting never touches single
+variables and storage levels are a cumulative sum rather than a re-sum of every earlier hour.
+"""
+import numpy as np
+
+from offgridoptimizer.product import Product
+
+
+class Solution:
+    # the arrays a Solution is made of, everything else is derived from them, see cache.SolutionCache
+    ARRAYS = ['energy_sold', 'grid_usage', 'energy_stored', 'storage_consumed', 'units', 'opened']
+    # the columns of results_df
+    RESULT_COLUMNS = ['hour', 'demand', 'pv_efficiency', 'wind_efficiency', 'capacity', 'storage_level',
+                      'energy_sold', 'grid_usage', 'date']
+
+    def __init__(self, project, energy_sold, grid_usage, energy_stored, storage_consumed, units, opened,
+                 grid_installed, objective=None, mip_gap=0.0):
+        self.project = project
+        self.energy_sold = energy_sold
+        self.grid_usage = grid_usage
+        self.energy_stored = energy_stored
+        self.storage_consumed = storage_consumed
+        self.units = units
+        self.opened = opened
+        self.grid_installed = grid_installed
+        self.objective = objective
+        self.mip_gap = mip_gap
+
+        # storage level at the end of each hour, and at its start: the end of the hour before
+        self.storage_after = project.initial_storage + \
+            np.cumsum(self.energy_stored - self.storage_consumed)
+        self.storage_level = np.concatenate([[project.initial_storage], self.storage_after])[:-1]
+
+        generation = [i for i, product in enumerate(project.products)
+                      if product.ut == Product.ELEC and product.et != Product.STORAGE]
+        self.capacity = project.efficiency_matrix(project.generation_products()) @ self.units[generation]
+
+    @classmethod
+    def from_model(cls, project):
+        storage = project.products_by_type(Product.STORAGE)
+        num_hours = len(project.hours)
+
+        families = [list(project.ss.values()),
+                    list(project.grid.hourly_usage.values())] + \
+                   [list(product.b.values()) for product in storage] + \
+                   [list(product.sc.values()) for product in storage] + \
+                   [[product.y for product in project.products],
+                    [product.x for product in project.products],
+                    [project.grid.grid_installed]]
+
+        model = project.model
+        values = np.array(model.getAttr('X', [v for family in families for v in family]))
+        values = np.split(values, np.cumsum([len(family) for family in families])[:-1])
+
+        energy_stored = np.sum(values[2:2 + len(storage)], axis=0) if storage else np.zeros(num_hours)
+        storage_consumed = np.sum(values[2 + len(storage):2 + 2 * len(storage)], axis=0) \
+            if storage else np.zeros(num_hours)
+        units, opened, (grid_installed,) = values[-3:]
+        return Solution(project, values[0], values[1], energy_stored, storage_consumed, units, opened,
+                        grid_installed, objective=model.ObjVal, mip_gap=model.MIPGap if model.IsMIP else 0.0)
+
+    def hourly(self, values):
+        return dict(zip(self.project.hours, values.tolist()))
+
+    def costs(self):
+        project = self.project
+        weights = project.weight_array()
+        toc = self.grid_installed * project.grid.grid_opening_cost + \
+            self.opened @ np.array([product.oc for product in project.products])
+        tmc = self.units @ np.array([product.mc for product in project.products])
+        tic = self.units @ np.array([product.ic for product in project.products])
+        tgc = self.grid_usage @ (project.grid_price_array() * weights)
+        tr = self.energy_sold @ (project.sale_price_array() * weights)
+        return (("Total Opening Cost", toc),
+                ("Total Maintenance Cost", tmc),
+                ("Total Incremental Cost", tic),
+                ("Total Grid Cost", tgc),
+                ("Total Revenue", tr),
+                ("Total Cost", toc + tmc + tic + tgc - tr))
+
+    def results_df(self):
+        """
+        One row per hour of the year covered by the Project, in hour order
+        """
+        import pandas as pd
+
+        project = self.project
+        columns = {'capacity': self.capacity,
+                   'storage_level': self.storage_level,
+                   'energy_sold': self.energy_sold,
+                   'grid_usage': self.grid_usage}
+
+        hours = np.asarray(project.hours, dtype=int)
+        compressed = project.compressed
+        if compressed is not None:
+            # every value of a step holds for each hour it stands for, no storage is modelled to move within it
+            columns = {column: compressed.expand(values) for column, values in columns.items()}
+            hours = compressed.expanded_hours()
+
+        order = np.argsort(hours, kind='stable')
+        hours = hours[order]
+        df = pd.DataFrame({'hour': hours,
+                           'demand': project.demand.hourly_demand.take(hours),
+                           'pv_efficiency': project.efficiency.hourly_solar_capacity.take(hours),
+                           'wind_efficiency': project.efficiency.hourly_wind_capacity.take(hours),
+                           **{column: values[order] for column, values in columns.items()}})
+        df['date'] = pd.Timestamp('2019-01-01') + pd.to_timedelta(df['hour'], unit='H')
+        return df
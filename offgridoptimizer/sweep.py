@@ -0,0 +1,199 @@
+"""
+Parameter sweeps: solve every combination of a set of config edits and collect one result table.
+
+    python -m offgridoptimizer.sweep configs/medium_budget.json \\
+        --axis location=asheville_nc,sedona_az,yakima_wa --axis budget.initial=20000,40000 \\
+        --axis allow_grid=true,false --hours one_day_each_month --output sweep.parquet
+
+An axis is a dotted config key and the values it takes. Scenarios are solved in a process pool,
+each worker loads the location profiles once through the shared registry and memory-mapped series
+cache, and every solve is capped at `threads` Gurobi threads so the workers do not oversubscribe.
+With --relax every scenario is solved as a rounded LP relaxation, see heuristic.RoundedRelaxation,
+which screens many scenarios quickly and reports each one's lower bound and gap.
+"""
+import argparse
+import copy
+import itertools
+import json
+import multiprocessing
+import os
+import pathlib
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+
+from offgridoptimizer.config_schema import load_and_validate, validate_config
+from offgridoptimizer.heuristic import RoundedRelaxation
+from offgridoptimizer.product import StorageProduct
+from offgridoptimizer.project import Project
+from offgridoptimizer.registry import location_profile
+from offgridoptimizer.timeindex import HOURS, HOUR_SETS
+
+
+def set_path(config, path, value):
+    *parents, key = path.split('.')
+    for parent in parents:
+        config = config[parent]
+    config[key] = value
+
+
+def scenarios(base_config, axes):
+    """
+    Every combination of the axes applied to a copy of base_config
+
+    :param axes: dict of dotted config key to a list of values, or to a dict of label to value
+                 for values that do not fit in a table cell such as product catalogs
+    :return: list of (labels, config) where labels maps every axis to the label of its value
+    """
+    keys = list(axes)
+    options = [list(axes[key].items()) if isinstance(axes[key], Mapping) else [(v, v) for v in axes[key]]
+               for key in keys]
+
+    result = []
+    for combination in itertools.product(*options):
+        config = copy.deepcopy(base_config)
+        for key, (_, value) in zip(keys, combination):
+            set_path(config, key, value)
+        result.append(({key: label for key, (label, _) in zip(keys, combination)}, config))
+
+    return result
+
+
+def solve_scenario(job):
+    """
+    Solve one scenario, runs in a worker process
+
+    :param job: (labels, config, hours, threads, whether to round the LP relaxation, Project kwargs)
+    :return: dict of the labels, solve status, costs and sizing
+    """
+    labels, config, hours, threads, relax, kwargs = job
+    project = Project.project_from_config(config, hours=hours, validate=False, **kwargs)
+    project.model.setParam('OutputFlag', 0)
+    project.model.setParam('Threads', threads)
+    rounded = RoundedRelaxation(project) if relax else None
+    if rounded is None:
+        project.optimize()
+
+    row = dict(labels)
+    row.update({'status': project.model.Status,
+                'runtime': project.model.Runtime if rounded is None else rounded.seconds,
+                'objective': project.model.ObjVal if project.model.SolCount else None})
+    if rounded is not None:
+        row.update({'lower_bound': rounded.lower_bound, 'gap': rounded.gap})
+    if project.model.SolCount:
+        sizing = project.sizing()
+        row.update(project.costs())
+        row.update({f'units_{product.name}': units for product, units in zip(project.products, sizing.units)})
+        row['grid_installed'] = sizing.grid_installed
+
+    project.model.dispose()
+    return row
+
+
+def load_locations(locations):
+    # pool initializer: every worker reads each location once, from the memory-mapped series cache
+    for location in locations:
+        location_profile(location)
+
+
+def sweep(base_config, axes, hours=HOURS, processes=None, threads=None, validate=True, relax=False, **kwargs):
+    """
+    Solve every scenario of base_config and axes
+
+    :param processes: worker processes, defaults to every core, 0 solves in this process
+    :param threads: Gurobi threads of each solve, defaults to the cores left per worker
+    :param relax: round every scenario's LP relaxation rather than solve it to optimality
+    :param kwargs: passed to every Project, e.g. storage_formulation and build
+    :return: pandas DataFrame with one row per scenario
+    """
+    import pandas as pd
+
+    jobs = scenarios(base_config, axes)
+    if validate:
+        for _, config in jobs:
+            validate_config(config)
+
+    cores = os.cpu_count() or 1
+    processes = min(cores, len(jobs)) if processes is None else processes
+    threads = threads or max(1, cores // max(processes, 1))
+    hours = [int(hour) for hour in hours]
+    jobs = [(labels, config, hours, threads, relax, kwargs) for labels, config in jobs]
+
+    # build the series cache in this process, so workers only ever read it
+    locations = sorted({config['location'] for _, config, *_ in jobs})
+    load_locations(locations)
+
+    if processes:
+        context = multiprocessing.get_context('spawn')  # every worker starts its own Gurobi environment
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                 initializer=load_locations, initargs=(locations,)) as pool:
+            rows = list(pool.map(solve_scenario, jobs))
+    else:
+        rows = [solve_scenario(job) for job in jobs]
+
+    return pd.DataFrame(rows)
+
+
+def write_table(df, path):
+    """
+    Write df as Parquet (needs pyarrow or fastparquet) or CSV, chosen by the file suffix
+    """
+    path = pathlib.Path(path)
+    if path.suffix == '.parquet':
+        df.to_parquet(path, index=False)
+    elif path.suffix == '.csv':
+        df.to_csv(path, index=False)
+    else:
+        raise ValueError(f'Unknown result table format {path.suffix}, expected .parquet or .csv')
+
+
+def parse_axis(text):
+    """
+    KEY=V1,V2,... with every value read as JSON when it parses, e.g. budget.initial=20000,40000
+    """
+    key, _, values = text.partition('=')
+    if not key or not values:
+        raise argparse.ArgumentTypeError(f'Expected KEY=V1,V2,... got {text}')
+
+    def parse(value):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return value
+
+    return key, [parse(value) for value in values.split(',')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser('Off-Grid Optimizer parameter sweep')
+    parser.add_argument('config', type=str, help='base config every scenario starts from')
+    parser.add_argument('--axis', type=parse_axis, action='append', default=[],
+                        help='dotted config key and its values, e.g. budget.initial=20000,40000')
+    parser.add_argument('--catalog', type=str, action='append', default=[],
+                        help='config file whose products form one value of the products axis')
+    parser.add_argument('--hours', type=str, default='year', choices=list(HOUR_SETS))
+    parser.add_argument('--formulation', type=str, default=StorageProduct.STATE_OF_CHARGE,
+                        choices=StorageProduct.FORMULATIONS)
+    parser.add_argument('--build', type=str, default=None, choices=Project.BUILDS,
+                        help='defaults to matrix for the soc formulation and to expression otherwise')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--threads', type=int, default=None)
+    parser.add_argument('--relax', action='store_true',
+                        help='round the LP relaxation of every scenario, reporting its lower bound and gap')
+    parser.add_argument('--output', type=str, default='sweep.csv', help='.parquet or .csv result table')
+    args = parser.parse_args(argv)
+    build = args.build or Project.default_build(args.formulation)
+    if build == Project.MATRIX_BUILD and args.formulation != StorageProduct.STATE_OF_CHARGE:
+        parser.error(f'--build {build} requires --formulation {StorageProduct.STATE_OF_CHARGE}')
+
+    axes = dict(args.axis)
+    if args.catalog:
+        axes['products'] = {pathlib.Path(path).stem: load_and_validate(path)['products'] for path in args.catalog}
+
+    df = sweep(load_and_validate(args.config), axes, hours=HOUR_SETS[args.hours](), processes=args.processes,
+               threads=args.threads, relax=args.relax, storage_formulation=args.formulation, build=build)
+    write_table(df, args.output)
+    print(f'{len(df)} scenarios written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Solver telemetry: MIP progress events and final solve statistics of Project.optimize.
+
+A SolveTelemetry passed to Project.optimize records, through a Gurobi callback, what presolve removed
+and how the incumbent, bound, node count and gap move, then the final statistics of the solve and the
+size of the model. The records are written as JSON lines, one event per line, or as a Prometheus text
+file of gauges for a node exporter's textfile collector.
+
+    telemetry = SolveTelemetry(labels={'config': 'medium_budget'})
+    project.optimize(telemetry=telemetry)
+    telemetry.write('solve.jsonl')  # or 'solve.prom'
+"""
+import json
+import os
+import pathlib
+import time
+
+import gurobipy as gp
+
+# final statistics read from the model after the solve, with the Prometheus gauge each one becomes
+MODEL_STATS = {'Runtime': 'offgrid_solve_runtime_seconds',
+               'Work': 'offgrid_solve_work_units',
+               'Status': 'offgrid_solve_status',
+               'ObjVal': 'offgrid_solve_objective',
+               'ObjBound': 'offgrid_solve_bound',
+               'MIPGap': 'offgrid_solve_gap',
+               'NodeCount': 'offgrid_solve_nodes',
+               'IterCount': 'offgrid_solve_simplex_iterations',
+               'SolCount': 'offgrid_solve_solutions',
+               'NumVars': 'offgrid_model_vars',
+               'NumIntVars': 'offgrid_model_int_vars',
+               'NumConstrs': 'offgrid_model_constrs',
+               'NumNZs': 'offgrid_model_nonzeros'}
+PRESOLVE_STATS = {'rows_removed': (gp.GRB.Callback.PRE_ROWDEL, 'offgrid_presolve_rows_removed'),
+                  'columns_removed': (gp.GRB.Callback.PRE_COLDEL, 'offgrid_presolve_columns_removed'),
+                  'bounds_changed': (gp.GRB.Callback.PRE_BNDCHG, 'offgrid_presolve_bounds_changed'),
+                  'coefficients_changed': (gp.GRB.Callback.PRE_COECHG, 'offgrid_presolve_coefficients_changed')}
+
+
+def relative_gap(incumbent, bound):
+    if incumbent >= gp.GRB.INFINITY or abs(bound) >= gp.GRB.INFINITY:
+        return None
+
+    return abs(incumbent - bound) / max(abs(incumbent), 1e-10)
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class SolveTelemetry:
+    def __init__(self, labels=None, interval=0.0):
+        """
+        :param labels: dict added to every record and to every Prometheus sample, e.g. the config name
+        :param interval: least seconds between two MIP progress events, new incumbents are always recorded
+        """
+        self.labels = dict(labels or {})
+        self.interval = interval
+        self.events = []
+        self.presolve = {}
+        self.final = {}
+        self.last_progress = -float('inf')
+
+    def record(self, event, **values):
+        self.events.append(dict(self.labels, event=event, **values))
+
+    def callback(self, model, where):
+        if where == gp.GRB.Callback.PRESOLVE:
+            self.presolve = {name: model.cbGet(what) for name, (what, _) in PRESOLVE_STATS.items()}
+        elif where == gp.GRB.Callback.MIP:
+            elapsed = model.cbGet(gp.GRB.Callback.RUNTIME)
+            if elapsed - self.last_progress >= self.interval:
+                self.last_progress = elapsed
+                self.progress('progress', elapsed, model.cbGet(gp.GRB.Callback.MIP_OBJBST),
+                              model.cbGet(gp.GRB.Callback.MIP_OBJBND), model.cbGet(gp.GRB.Callback.MIP_NODCNT))
+        elif where == gp.GRB.Callback.MIPSOL:
+            # MIPSOL_OBJBST is the incumbent before this solution is accepted
+            incumbent = min(model.cbGet(gp.GRB.Callback.MIPSOL_OBJ), model.cbGet(gp.GRB.Callback.MIPSOL_OBJBST))
+            self.progress('incumbent', model.cbGet(gp.GRB.Callback.RUNTIME),
+                          incumbent, model.cbGet(gp.GRB.Callback.MIPSOL_OBJBND),
+                          model.cbGet(gp.GRB.Callback.MIPSOL_NODCNT))
+
+    def progress(self, event, elapsed, incumbent, bound, nodes):
+        self.record(event, time=elapsed, incumbent=incumbent if incumbent < gp.GRB.INFINITY else None,
+                    bound=bound if abs(bound) < gp.GRB.INFINITY else None, nodes=int(nodes),
+                    gap=relative_gap(incumbent, bound))
+
+    def finish(self, project):
+        """
+        Record the final statistics of project's last optimize
+        """
+        model = project.model
+        if project.cached:
+            self.final = {'cached': True, 'Status': gp.GRB.OPTIMAL, 'Runtime': 0.0,
+                          'ObjVal': project.solution().objective, 'MIPGap': project.solution().mip_gap}
+        else:
+            self.final = {'cached': False}
+            for name in MODEL_STATS:
+                try:
+                    self.final[name] = model.getAttr(name)
+                except (gp.GurobiError, AttributeError):
+                    pass  # e.g. ObjVal without a solution or MIPGap of an LP
+
+        self.record('final', wall_time=time.time(), presolve=self.presolve, **self.final)
+
+    def json_lines(self):
+        return ''.join(json.dumps(event) + '\n' for event in self.events)
+
+    def prometheus(self):
+        """
+        Final statistics as Prometheus gauges in the text exposition format
+        """
+        labels = ','.join(f'{key}="{escape(value)}"' for key, value in sorted(self.labels.items()))
+        labels = f'{{{labels}}}' if labels else ''
+        samples = [(metric, self.final[name]) for name, metric in MODEL_STATS.items() if name in self.final]
+        samples += [(metric, self.presolve[name]) for name, (_, metric) in PRESOLVE_STATS.items()
+                    if name in self.presolve]
+        samples += [('offgrid_solve_cached', int(self.final.get('cached', False))),
+                    ('offgrid_solve_progress_events', sum(e['event'] != 'final' for e in self.events))]
+
+        lines = []
+        for metric, value in samples:
+            lines += [f'# TYPE {metric} gauge', f'{metric}{labels} {float(value)!r}']
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """
+        Write the JSON lines (.jsonl) or Prometheus text (.prom) to path, replaced atomically
+        so a scraper never reads half a file
+        """
+        path = pathlib.Path(path)
+        if path.suffix == '.jsonl':
+            text = self.json_lines()
+        elif path.suffix == '.prom':
+            text = self.prometheus()
+        else:
+            raise ValueError(f'Unknown telemetry format {path.suffix}, expected .jsonl or .prom')
+
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as fp:
+            fp.write(text)
+        os.replace(tmp_path, path)
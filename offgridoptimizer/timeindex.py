@@ -0,0 +1,77 @@
+"""
+Canonical hourly index of the (non-leap) data year.
+
+Every location series is aligned to the same HOURS_IN_YEAR long array, so an hour selection is
+just an array of positions, a slice or a boolean mask into it.
+"""
+import numpy as np
+
+from offgridoptimizer import HOURS_IN_YEAR, HOURS_IN_DAY
+
+YEAR = 2019
+
+HOURS = np.arange(HOURS_IN_YEAR)
+TIMES = np.datetime64(f'{YEAR}-01-01T00', 'h') + HOURS.astype('timedelta64[h]')
+MONTH = (TIMES.astype('datetime64[M]').astype(int) % 12) + 1
+DAY = (TIMES.astype('datetime64[D]') - TIMES.astype('datetime64[M]')).astype(int) + 1
+HOUR_OF_DAY = HOURS % HOURS_IN_DAY
+
+LEAP_DAY = slice(59 * HOURS_IN_DAY, 60 * HOURS_IN_DAY)  # Feb 29th in a leap year's hour of year
+
+
+def align(array):
+    """
+    Align one series to the canonical index
+
+    Leap-day hours are dropped and hours missing from the source data (daylight savings,
+    gaps at the end of the year) are linearly interpolated from their neighbours.
+
+    :param array: dense float array indexed by hour of year, NaN where the source has no value
+    :return: float array of length HOURS_IN_YEAR with no NaN
+    """
+    array = np.asarray(array, dtype=float)
+    if len(array) > HOURS_IN_YEAR and np.isnan(array[HOURS_IN_YEAR:]).all():
+        array = array[:HOURS_IN_YEAR]
+    elif len(array) > HOURS_IN_YEAR:
+        array = np.delete(array, np.arange(LEAP_DAY.start, LEAP_DAY.stop))[:HOURS_IN_YEAR]
+
+    present = ~np.isnan(array)
+    if present.all():
+        return array.copy()
+
+    if not present.any():
+        raise ValueError('Cannot align a series without any values')
+
+    return np.interp(HOURS, HOURS[present], array[present])
+
+
+def month_mask(months):
+    return np.isin(MONTH, list(months))
+
+
+def hours_each_month(months):
+    return HOURS[month_mask(months)]
+
+
+def one_day_each_month():
+    return HOURS[DAY == 1]
+
+
+def everyday_one_month(month):
+    return HOURS[MONTH == month]
+
+
+def every_nth_hour(n, start=0):
+    return HOURS[start::n]
+
+
+def hours_to_dates(hours):
+    return TIMES[np.asarray(hours, dtype=int)]
+
+
+# named hour selections for the command line tools
+HOUR_SETS = {'year': lambda: HOURS,
+             'one_day_each_month': one_day_each_month,
+             'one_month': lambda: everyday_one_month(1),
+             'every_other_hour': lambda: every_nth_hour(2),
+             'first_week': lambda: HOURS[:7 * HOURS_IN_DAY]}
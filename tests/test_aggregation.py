@@ -0,0 +1,59 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.aggregation import aggregation_error, k_medoids, RepresentativeDays, DAYS_IN_YEAR
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+def test_k_medoids_separates_clusters():
+    features = np.array([[0.0], [0.1], [0.2], [10.0], [10.1]])
+    medoids, labels = k_medoids(features, 2)
+
+    assert sorted(medoids.tolist()) == [1, 3] or sorted(medoids.tolist()) == [1, 4]
+    assert labels[0] == labels[1] == labels[2] != labels[3] == labels[4]
+
+
+def test_k_medoids_with_duplicate_items():
+    medoids, labels = k_medoids(np.array([[0.0, 0], [0, 0], [0, 0], [1, 1]]), 3)
+
+    assert len(set(medoids.tolist())) == 3
+    assert labels[3] != labels[0] == labels[1] == labels[2]
+
+
+def test_representative_days_cover_the_year():
+    days = RepresentativeDays.from_location('asheville_nc', 6)
+
+    assert days.weights.sum() == DAYS_IN_YEAR
+    assert (np.diff(days.days) > 0).all()
+    assert (days.days[days.labels] >= 0).all()
+    assert len(days.hours()) == len(days.hour_weights()) == 6 * 24
+    assert days.hour_weights().sum() == DAYS_IN_YEAR * 24
+
+
+def test_aggregation_error_reports_both_solves():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    config['location'] = 'sedona_az'
+    error = aggregation_error(config, 1, reference_hours=range(2000, 2048))
+
+    # both objectives solved here on their own, the representative day weighted to stand for the whole year
+    days = RepresentativeDays.from_location('sedona_az', 1)
+    objectives = []
+    for hours, weights in [(days.hours(), days.hour_weights()), (range(2000, 2048), None)]:
+        project = Project.project_from_config(config, hours=hours, weights=weights, validate=False,
+                                              storage_formulation='soc', build='matrix')
+        project.model.setParam('OutputFlag', 0)
+        project.optimize()
+        objectives.append(project.model.ObjVal)
+    objective, reference_objective = objectives
+
+    assert error['k'] == 1 and error['days'] == days.days.tolist()
+    assert error['hours'] == 24 and error['reference_hours'] == 48
+    assert error['objective'] == pytest.approx(objective)
+    assert error['reference_objective'] == pytest.approx(reference_objective)
+    assert error['relative_error'] == pytest.approx(abs(objective - reference_objective) / reference_objective)
+    assert set(error['costs']) >= {'Total Cost', 'Total Grid Cost'}
+    assert all(value[2] >= 0 for value in error['costs'].values())
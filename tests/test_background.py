@@ -0,0 +1,44 @@
+import pathlib
+
+import gurobipy as gp
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.background import BackgroundSolve
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+def build():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    project = Project.project_from_config(config, hours=range(2000, 2168), validate=False,
+                                          storage_formulation='soc', build='matrix')
+    project.model.setParam('OutputFlag', 0)
+    return project
+
+
+def test_background_solve_reports_progress_and_finishes():
+    reports, done = [], []
+    solve = BackgroundSolve(build, on_progress=reports.append, on_done=done.append, interval=0).start()
+    solve.join(timeout=120)
+
+    assert not solve.running and solve.error is None
+    assert done == [solve.project] and solve.project.status == gp.GRB.OPTIMAL
+    assert reports and {'incumbent', 'bound', 'gap', 'elapsed'} <= set(reports[-1])
+
+
+def test_cancel_stops_the_solve():
+    done = []
+    solve = BackgroundSolve(build, on_done=done.append, interval=0)
+    solve.on_progress = lambda progress: solve.cancel()
+    solve.start().join(timeout=120)
+
+    assert done == [solve.project]
+    assert solve.project.status == gp.GRB.INTERRUPTED
+
+
+def test_errors_are_reported():
+    errors = []
+    solve = BackgroundSolve(lambda: Project.project_from_config({}, hours=[]), on_error=errors.append).start()
+    solve.join(timeout=60)
+
+    assert errors and errors[0] is solve.error
@@ -0,0 +1,51 @@
+import importlib.util
+import pathlib
+
+import pytest
+
+ROOT = pathlib.Path(__file__).parent.parent
+
+
+def load_suite():
+    spec = importlib.util.spec_from_file_location('benchmark_suite', ROOT / 'benchmarks' / 'suite.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_run_case_and_regressions():
+    suite = load_suite()
+    row = suite.run_case(('medium_budget', 'sedona_az', 'first_week', 60, 1, {'storage_formulation': 'soc',
+                                                                            'build': 'matrix'}, 0.01, False))
+
+    assert row['case'] == 'medium_budget/sedona_az/first_week' and row['status'] == 2
+    assert all(row[stage] >= 0 for stage in suite.STAGES) and row['nonzeros'] > 0 and row['peak_rss_mb'] > 0
+    assert 0 <= row['first_incumbent_s'] <= row['gap_s'] <= row['solve_s'] and 'heuristic_s' not in row
+    assert suite.regressions(row, row, 0.25, 0.2) == []
+
+    slower = dict(row, build_s=10 * max(row['build_s'], 1), nonzeros=row['nonzeros'] + 1, status=9)
+    assert [found.split()[0] for found in suite.regressions(slower, row, 0.25, 0.2)] == \
+        ['build_s', 'nonzeros', 'status']
+
+
+def test_run_case_from_greedy_start():
+    suite = load_suite()
+    row = suite.run_case(('low_budget', 'sedona_az', 'first_week', 60, 1, {'storage_formulation': 'soc',
+                                                                         'build': 'matrix'}, 0.01, True))
+
+    assert row['status'] == 2
+    assert 0 < row['heuristic_s'] <= row['first_incumbent_s'] <= row['gap_s'] <= row['solve_s']
+
+
+def test_cases_without_a_baseline_are_reported(tmp_path):
+    suite = load_suite()
+    row = {'case': 'low_budget/sedona_az/first_week', 'status': 2, 'build_s': 1.0}
+    slower = dict(row, case='medium_budget/sedona_az/first_week', build_s=10.0)
+
+    assert suite.load_baseline(tmp_path / 'baseline.json') == {}
+    assert suite.compare([row], {}, 0.25, 0.2) == ({}, [row['case']])
+    flagged, missing = suite.compare([row, slower], {slower['case']: row}, 0.25, 0.2)
+    assert list(flagged) == [slower['case']] and missing == [row['case']]
+
+    with pytest.raises(SystemExit):
+        suite.main(['--formulation', 'cumulative', '--build', 'matrix'])
@@ -0,0 +1,46 @@
+import pathlib
+
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.benders import Benders
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+DAYS = [range(2000 + 24 * day, 2024 + 24 * day) for day in range(4)]
+
+
+@pytest.mark.parametrize('config_name', ['medium_budget', 'high_budget'])
+@pytest.mark.parametrize('storage_formulation, build', [('soc', 'matrix'), ('cumulative', 'expression')])
+def test_single_period_matches_monolithic(config_name, storage_formulation, build):
+    config = load_and_validate(CONFIGS / f'{config_name}.json')
+    hours = list(range(2000, 2048))
+    project = Project.project_from_config(config, hours=hours, validate=False,
+                                          storage_formulation=storage_formulation, build=build)
+    project.model.setParam('OutputFlag', 0)
+    project.optimize()
+
+    benders = Benders(config, [hours], processes=0, validate=False,
+                      storage_formulation=storage_formulation, build=build).solve()
+
+    assert benders.gap <= benders.tolerance
+    assert benders.upper_bound == pytest.approx(project.model.ObjVal, rel=1e-4)
+
+
+def test_process_pool_matches_serial():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    serial = Benders(config, DAYS, processes=0, storage_formulation='soc', build='matrix').solve()
+    pooled = Benders(config, DAYS, processes=2, storage_formulation='soc', build='matrix').solve()
+
+    assert pooled.upper_bound == pytest.approx(serial.upper_bound)
+    assert pooled.sizing == serial.sizing
+
+
+def test_feasibility_cuts_without_grid():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    config['allow_grid'] = False
+    benders = Benders(config, DAYS, processes=0, storage_formulation='soc', build='matrix').solve()
+
+    assert benders.history[0]['infeasible_periods'] > 0
+    assert benders.history[-1]['infeasible_periods'] == 0
+    assert benders.sizing.grid_installed == 0
+    assert benders.gap <= benders.tolerance
@@ -0,0 +1,84 @@
+import pathlib
+
+import gurobipy as gp
+import numpy as np
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.bounds import MAX_ENERGY, MAX_GRID_USAGE, MAX_STORAGE, MAX_UNITS, BigM, max_units
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+HOURS = range(2000, 2048)
+
+
+def project(config, **kwargs):
+    p = Project.project_from_config(config, hours=HOURS, validate=False, **kwargs)
+    p.model.setParam('OutputFlag', 0)
+    return p
+
+
+def coefficients(p):
+    model = p.model
+    model.update()
+    values = [c.RHS for c, _ in p.product_constraint.unit_limits]
+    for constraint, variable, _, _ in p.product_constraint.bound_links:
+        constraints = constraint.tolist() if isinstance(constraint, gp.MConstr) else constraint
+        values += [model.getCoeff(c, variable) for c in np.atleast_1d(np.array(constraints, dtype=object))]
+    return values
+
+
+def test_units_follow_the_budget():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    p = project(config)
+    for product, units in zip(p.products, p.product_constraint.bounds.units):
+        assert units <= MAX_UNITS
+        assert units * product.ic <= config['budget']['initial']
+        assert units * product.mc <= config['budget']['monthly']
+
+    product = p.products[0]
+    product.ic, product.mc = 0, 0
+    assert max_units(product, 1, 1) == MAX_UNITS
+
+
+def test_no_bound_exceeds_the_constant_it_replaces():
+    config = load_and_validate(CONFIGS / 'high_budget.json')
+    # storage so cheap its most units hold far more than the old constant
+    for product in config['products']:
+        if product['energy_type'] == 'storage':
+            product.update(incremental_cost=1, maintenance_cost=0)
+    bounds = BigM(project(config))
+
+    assert max(bounds.units) <= MAX_UNITS
+    assert bounds.storage_capacity == MAX_STORAGE and bounds.storage_consumed <= MAX_STORAGE
+    assert bounds.grid_usage <= MAX_GRID_USAGE
+    assert np.all(bounds.energy_sold <= MAX_ENERGY)
+
+
+@pytest.mark.parametrize('storage_formulation, build', [('soc', 'matrix'), ('cumulative', 'expression')])
+def test_tighter_bounds_keep_the_optimum(storage_formulation, build):
+    config = load_and_validate(CONFIGS / 'high_budget.json')
+    p = project(config, storage_formulation=storage_formulation, build=build)
+    p.optimize()
+    relaxed = p.model.relax()
+    relaxed.setParam('OutputFlag', 0)
+    relaxed.optimize()
+
+    # the objective of this horizon with the old constant big-M values
+    assert p.model.ObjVal == pytest.approx(11650, rel=1e-6)
+    assert relaxed.ObjVal > 1618.48  # the LP bound with the old constants
+
+
+@pytest.mark.parametrize('storage_formulation, build', [('soc', 'matrix'), ('soc', 'expression')])
+def test_edits_update_the_bounds_in_place(storage_formulation, build):
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    edited = project(config, storage_formulation=storage_formulation, build=build)
+    edited.set_budget_constraints(20000, 500)
+    edited.set_product_costs(edited.products[2], incremental_cost=1500)
+    edited.set_demand_constraints(edited.demand_array() * 2)
+
+    config['budget'] = {'initial': 20000, 'monthly': 500}
+    config['products'][2]['incremental_cost'] = 1500
+    fresh = project(config, storage_formulation=storage_formulation, build=build)
+    fresh.set_demand_constraints(fresh.demand_array() * 2)
+
+    assert coefficients(edited) == pytest.approx(coefficients(fresh))
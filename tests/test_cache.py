@@ -0,0 +1,64 @@
+import pathlib
+
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.cache import SolutionCache, project_key
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+HOURS = range(2000, 2048)
+
+
+def solve(config, cache, **kwargs):
+    project = Project.project_from_config(config, hours=HOURS, validate=False, cache=cache,
+                                          storage_formulation='soc', build='matrix', **kwargs)
+    project.model.setParam('OutputFlag', 0)
+    project.optimize()
+    return project
+
+
+def test_second_solve_is_a_cache_hit(tmp_path):
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    cache = SolutionCache(tmp_path)
+    first = solve(config, cache)
+    second = solve(config, cache)
+
+    assert not first.cached and second.cached
+    assert cache.info()['hits'] == 1 and cache.info()['entries'] == 1
+    assert dict(second.costs()) == pytest.approx(dict(first.costs()))
+    assert second.selected_products() == first.selected_products()
+    assert second.results_df().equals(first.results_df())
+    assert second.solution().objective == pytest.approx(first.model.ObjVal)
+
+
+def test_key_follows_edits_and_parameters(tmp_path):
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    project = solve(config, SolutionCache(tmp_path))
+    key = project_key(project)
+
+    project.set_budget_constraints(1000, 100)
+    assert project_key(project) != key
+    project.set_budget_constraints(config['budget']['initial'], config['budget']['monthly'])
+    assert project_key(project) == key
+
+    project.model.setParam('MIPGap', 0.1)
+    assert project_key(project) != key
+    assert project_key(solve(config, None, initial_storage=1)) != key
+
+    # two fixed sizings that only differ in whether storage is installed
+    sizing = project.sizing()
+    project.fix_sizing(sizing, storage_installed=0)
+    fixed = project_key(project)
+    project.fix_sizing(sizing, storage_installed=1)
+    assert project_key(project) != fixed
+
+
+def test_eviction_bounds_the_directory(tmp_path):
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    cache = SolutionCache(tmp_path, max_bytes=0)
+    solve(config, cache)
+    assert cache.info()['entries'] == 0
+
+    cache = SolutionCache(tmp_path, max_age=-1)
+    solve(config, cache)
+    assert not solve(config, cache).cached
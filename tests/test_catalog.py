@@ -0,0 +1,89 @@
+import copy
+import pathlib
+
+import numpy as np
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.catalog import CatalogPresolve, DOMINATED, UNAFFORDABLE
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+HOURS = range(2000, 2048)
+
+
+def product(name, energy_type, opening_cost, incremental_cost, maintenance_cost, capacity):
+    return {'name': name, 'utility_type': 'electricity', 'energy_type': energy_type,
+            'opening_cost': opening_cost, 'incremental_cost': incremental_cost,
+            'maintenance_cost': maintenance_cost, 'capacity': capacity, 'amortization': 30}
+
+
+def dropped(catalog):
+    return {row['name']: (row['reason'], row['by']) for row in catalog.dropped}
+
+
+def vendor_catalog(config, skus=6, seed=0):
+    # variants of every product of config, each no better than the original in every respect
+    rng = np.random.default_rng(seed)
+    products = list(config['products'])
+    for p in config['products']:
+        for i in range(skus):
+            variant = dict(p, name=f'{p["name"]}_{i}')
+            for key in ['opening_cost', 'incremental_cost', 'maintenance_cost']:
+                variant[key] = p[key] * (1 + rng.choice([0, 0.1, 0.5]))
+            variant['capacity'] = p['capacity'] * rng.choice([0.5, 0.9, 1])
+            products.append(variant)
+    return dict(config, products=products)
+
+
+def test_dominated_products_are_dropped():
+    catalog = CatalogPresolve([product('a', 'solar', 3000, 100, 0, 4),
+                               product('b', 'solar', 3000, 90, 0, 5),
+                               product('c', 'solar', 2000, 200, 0, 4),
+                               product('b_copy', 'solar', 3000, 90, 0, 5),
+                               product('d', 'wind', 3000, 80, 0, 5)], 40000, 500)
+
+    # c opens cheaper, d is of another energy type
+    assert [p['name'] for p in catalog.kept] == ['b', 'c', 'd']
+    assert dropped(catalog) == {'a': (DOMINATED, 'b'), 'b_copy': (DOMINATED, 'b')}
+    assert '3 of 5 products kept' in catalog.report()
+
+
+def test_unaffordable_products_are_dropped():
+    catalog = CatalogPresolve([product('cheap', 'solar', 3000, 100, 0, 4),
+                               product('big', 'solar', 3000, 38000, 0, 400),
+                               product('upkeep', 'wind', 0, 100, 600, 50),
+                               product('opener', 'storage', 0, 50000, 0, 100),
+                               product('battery', 'storage', 5000, 1000, 0, 10)], 40000, 500)
+
+    # opener is unaffordable but keeps opening storage free
+    assert [p['name'] for p in catalog.kept] == ['cheap', 'opener', 'battery']
+    assert dropped(catalog) == {'big': (UNAFFORDABLE, 'initial budget'), 'upkeep': (UNAFFORDABLE, 'monthly budget')}
+
+
+@pytest.mark.parametrize('config_name', ['medium_budget', 'high_budget'])
+def test_presolve_keeps_the_optimum(config_name):
+    config = vendor_catalog(load_and_validate(CONFIGS / f'{config_name}.json'))
+    projects = [Project.project_from_config(config, hours=HOURS, validate=False, presolve_catalog=presolve)
+                for presolve in [False, True]]
+    for p in projects:
+        p.model.setParam('OutputFlag', 0)
+        p.optimize()
+
+    full, presolved = projects
+    assert len(presolved.products) < len(full.products)
+    assert presolved.model.NumVars < full.model.NumVars
+    assert len(presolved.products) + len(presolved.catalog.dropped) == len(full.products)
+    assert presolved.model.ObjVal == pytest.approx(full.model.ObjVal, rel=1e-6)
+
+
+def test_presolved_project_refuses_edits_that_revive_products():
+    config = copy.deepcopy(load_and_validate(CONFIGS / 'medium_budget.json'))
+    config['products'].append(dict(config['products'][0], name='pricier', incremental_cost=20000))
+    p = Project.project_from_config(config, hours=range(2000, 2024), validate=False, presolve_catalog=True)
+    assert [row['name'] for row in p.catalog.dropped] == ['pricier']
+
+    p.set_budget_constraints(30000, 500)
+    with pytest.raises(ValueError):
+        p.set_budget_constraints(50000, 500)
+    with pytest.raises(ValueError):
+        p.set_product_costs(p.products[0], incremental_cost=30000)
@@ -0,0 +1,97 @@
+import importlib.util
+import json
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).parent.parent
+CONFIGS = ROOT / 'configs'
+
+
+def load_cli():
+    spec = importlib.util.spec_from_file_location('offgrid_cli', ROOT / '__main__.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_cli_writes_summary_and_dispatch(tmp_path):
+    cli = load_cli()
+    assert cli.main([str(CONFIGS / 'medium_budget.json'), '--hours', 'first_week', '--threads', '1',
+                     '--output-dir', str(tmp_path)]) == 0
+
+    with open(tmp_path / 'medium_budget.json') as fp:
+        result = json.load(fp)
+
+    assert result['status'] == 'OPTIMAL' and result['hours'] == 7 * 24
+    assert result['costs']['Total Cost'] > 0
+    assert len(result['dispatch']['hour']) == 7 * 24
+
+
+def test_cli_continues_past_a_missing_config(tmp_path):
+    cli = load_cli()
+    assert cli.main([str(CONFIGS / 'nope.json'), str(CONFIGS / 'low_budget.json'), '--hours', 'first_week',
+                     '--threads', '1', '--output-dir', str(tmp_path)]) == 1
+
+    assert (tmp_path / 'low_budget.json').exists() and not (tmp_path / 'nope.json').exists()
+
+
+def test_cli_builds_the_cumulative_formulation_by_expression(tmp_path):
+    cli = load_cli()
+    assert cli.main([str(CONFIGS / 'low_budget.json'), '--formulation', 'cumulative', '--hours', 'first_week',
+                     '--threads', '1', '--output-dir', str(tmp_path)]) == 0
+
+    with open(tmp_path / 'low_budget.json') as fp:
+        assert json.load(fp)['status'] == 'OPTIMAL'
+
+    with pytest.raises(SystemExit):
+        cli.main([str(CONFIGS / 'low_budget.json'), '--formulation', 'cumulative', '--build', 'matrix',
+                  '--output-dir', str(tmp_path)])
+
+
+def test_cli_does_not_import_widgets():
+    code = f'import sys; sys.path.insert(0, {str(ROOT)!r}); import runpy; ' \
+           f'runpy.run_path({str(ROOT / "__main__.py")!r}, run_name="cli"); ' \
+           f'print(sorted(m for m in ("ipywidgets", "ipysheet", "plotly") if m in sys.modules))'
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip().splitlines()[-1] == '[]'
+
+
+def test_cli_writes_telemetry(tmp_path):
+    cli = load_cli()
+    cli.main([str(CONFIGS / 'medium_budget.json'), '--hours', 'first_week', '--threads', '1',
+              '--telemetry', 'prom', '--output-dir', str(tmp_path)])
+
+    metrics = (tmp_path / 'medium_budget.prom').read_text()
+    assert 'offgrid_model_vars{config="medium_budget",hours="first_week"}' in metrics
+    assert 'offgrid_presolve_rows_removed' in metrics
+
+
+def test_cli_reports_the_relaxation(tmp_path):
+    cli = load_cli()
+    assert cli.main([str(CONFIGS / 'low_budget.json'), '--hours', 'first_week', '--threads', '1', '--relax',
+                     '--output-dir', str(tmp_path)]) == 0
+
+    with open(tmp_path / 'low_budget.json') as fp:
+        result = json.load(fp)
+
+    assert result['relaxation']['lower_bound'] <= result['objective']
+    assert 0 <= result['relaxation']['gap'] < 1
+
+
+def test_cli_reports_the_relaxation_from_the_cache(tmp_path):
+    cli = load_cli()
+    results = []
+    for run in ['first', 'second']:
+        assert cli.main([str(CONFIGS / 'low_budget.json'), '--hours', 'first_week', '--threads', '1', '--relax',
+                         '--cache-dir', str(tmp_path / 'cache'), '--output-dir', str(tmp_path / run)]) == 0
+        with open(tmp_path / run / 'low_budget.json') as fp:
+            results.append(json.load(fp))
+
+    first, second = results
+    assert not first['cached'] and second['cached']
+    assert second['objective'] == first['objective']
+    assert second['relaxation']['gap'] == first['relaxation']['gap'] is not None
+    assert second['selected_products'] == first['selected_products']
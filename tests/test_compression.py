@@ -0,0 +1,76 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.capacity import Capacity
+from offgridoptimizer.compression import compress_hours
+from offgridoptimizer.demand import Demand
+from offgridoptimizer.registry import LOCATIONS, LocationProfile
+from offgridoptimizer.series import HourlySeries
+from offgridoptimizer.timeindex import HOUR_OF_DAY
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+@pytest.fixture
+def flat_location(monkeypatch):
+    # step-shaped demand and prices with rounded efficiencies, so runs of identical hours exist
+    base = LOCATIONS.get('asheville_nc')
+    profile = LocationProfile(
+        location='flat_test',
+        demand=Demand(HourlySeries(np.where((HOUR_OF_DAY >= 7) & (HOUR_OF_DAY < 22), 1.2, 0.6))),
+        efficiency=Capacity(HourlySeries(np.round(base.efficiency.hourly_solar_capacity.array, 1)),
+                            HourlySeries(np.round(base.efficiency.hourly_wind_capacity.array, 1))),
+        hourly_grid=HourlySeries(np.where(HOUR_OF_DAY >= 16, 0.2, 0.14)))
+    monkeypatch.setitem(LOCATIONS.profiles, LOCATIONS.key('flat_test'), profile)
+    return profile
+
+
+def generation_config():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    config['products'] = [p for p in config['products'] if p['energy_type'] != 'storage']
+    return config
+
+
+def test_compress_hours_merges_identical_runs(flat_location):
+    products = Project.project_from_config(generation_config(), hours=[0], validate=False).products
+    hours = np.arange(0, 48)
+    compressed = compress_hours(flat_location, hours, products)
+
+    assert compressed.durations.sum() == len(hours)
+    assert compressed.hours[0] == 0 and compressed.durations[0] == 1
+    assert len(compressed.hours) < len(hours)
+    assert compressed.expanded_hours().tolist() == hours.tolist()
+    assert compressed.weights.sum() == len(hours)
+
+
+@pytest.mark.parametrize('storage_formulation, build', [('cumulative', 'expression'), ('soc', 'expression'),
+                                                        ('soc', 'matrix')])
+def test_compressed_project_matches_hourly(flat_location, storage_formulation, build):
+    config = generation_config()
+    config['location'] = 'flat_test'
+
+    results = []
+    for compress in [False, True]:
+        project = Project.project_from_config(config, hours=range(100, 300), validate=False,
+                                              storage_formulation=storage_formulation, build=build,
+                                              compress=compress)
+        project.model.setParam('OutputFlag', 0)
+        project.optimize()
+        results.append((project.model.ObjVal, len(project.hours), project.results_df()))
+
+    (hourly_objective, hourly_steps, hourly_df), (objective, steps, df) = results
+    assert objective == pytest.approx(hourly_objective, rel=1e-6)
+    assert steps < hourly_steps
+    assert len(df) == len(hourly_df) == 200
+    assert df.grid_usage.sum() == pytest.approx(hourly_df.grid_usage.sum(), abs=1e-6)
+
+
+def test_no_hours_merged_with_storage(flat_location):
+    products = Project.project_from_config(load_and_validate(CONFIGS / 'medium_budget.json'), hours=[0],
+                                           validate=False).products
+    compressed = compress_hours(flat_location, np.arange(0, 48), products)
+
+    assert compressed.durations.tolist() == [1] * 48
@@ -0,0 +1,85 @@
+import pathlib
+
+import numpy as np
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.bounds import MAX_UNITS
+from offgridoptimizer.heuristic import GreedyStart, RoundedRelaxation
+from offgridoptimizer.telemetry import SolveTelemetry
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+HOURS = range(2000, 2096)
+
+
+def project(config, **kwargs):
+    p = Project.project_from_config(config, hours=HOURS, validate=False, **kwargs)
+    p.model.setParam('OutputFlag', 0)
+    return p
+
+
+@pytest.mark.parametrize('config_name', ['low_budget', 'medium_budget', 'high_budget_sedona_az'])
+@pytest.mark.parametrize('storage_formulation, build', [('soc', 'matrix'), ('cumulative', 'expression')])
+def test_start_is_the_first_incumbent(config_name, storage_formulation, build):
+    config = load_and_validate(CONFIGS / f'{config_name}.json')
+    p = project(config, storage_formulation=storage_formulation, build=build)
+    start = GreedyStart(p)
+
+    sizing = start.sizing
+    assert start.feasible and start.apply()
+    assert sizing.grid_installed == 1 and sum(sizing.opened) == sum(np.asarray(sizing.units) > 0)
+    assert start.capital_cost(np.array(sizing.units)) + p.grid.grid_opening_cost <= config['budget']['initial']
+    assert np.array(sizing.units) @ start.mc <= config['budget']['monthly']
+    # the copy the dispatch was solved on leaves the sizing of the Project's model free
+    assert all(product.y.UB > 0 for product in p.products)
+
+    telemetry = SolveTelemetry()
+    p.optimize(telemetry=telemetry)
+    first = next(event for event in telemetry.events if event['event'] == 'incumbent')
+    assert first['incumbent'] == pytest.approx(start.objective)
+    assert p.model.ObjVal <= start.objective + 1e-6
+
+
+def test_no_start_without_a_grid_to_fall_back_on():
+    config = load_and_validate(CONFIGS / 'low_budget.json')
+    config['allow_grid'] = False
+    config['budget'] = {'initial': 0, 'monthly': 0}
+    start = GreedyStart(project(config))
+
+    assert start.sizing.units == [0] * len(config['products']) and start.sizing.grid_installed == 0
+    assert not start.feasible and not start.apply()
+
+
+def test_free_product_stays_within_the_unit_limit():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    config['products'][0].update(incremental_cost=0, maintenance_cost=0)
+
+    for heuristic in [GreedyStart, RoundedRelaxation]:
+        sizing = heuristic(project(config)).sizing
+        assert 0 < sizing.units[0] <= MAX_UNITS
+
+
+@pytest.mark.parametrize('config_name', ['low_budget', 'high_budget'])
+def test_rounded_relaxation_is_within_its_gap(config_name):
+    config = load_and_validate(CONFIGS / f'{config_name}.json')
+    optimum = project(config, storage_formulation='soc', build='matrix')
+    optimum.optimize()
+
+    p = project(config, storage_formulation='soc', build='matrix')
+    rounded = RoundedRelaxation(p)
+
+    assert rounded.lower_bound <= optimum.model.ObjVal + 1e-6 <= rounded.objective + 2e-6
+    assert rounded.gap == pytest.approx((rounded.objective - rounded.lower_bound) / rounded.objective)
+    # the Project holds the rounded solution, every integer variable fixed so the dispatch was solved as an LP
+    assert p.sizing() == rounded.sizing
+    assert all(v.LB == v.UB for v in p.model.getVars() if v.VType != 'C')
+    assert p.storage_installed.UB == int(rounded.sizing.units[-1] > 0)
+    assert p.solution().objective == pytest.approx(rounded.objective)
+
+
+def test_repair_fits_the_budgets():
+    config = load_and_validate(CONFIGS / 'low_budget.json')
+    rounded = RoundedRelaxation(project(config))
+    units = rounded.repair(np.full(len(config['products']), 5))
+
+    assert rounded.fits(units) and not rounded.fits(units + 1)
@@ -0,0 +1,24 @@
+import json
+import subprocess
+import sys
+
+IMPORT_BUDGET = 2.0  # seconds, measured in a fresh interpreter
+
+CODE = '''
+import json, sys, time
+start = time.perf_counter()
+import offgridoptimizer
+from offgridoptimizer import project
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "heavy": sorted(m for m in ("pandas", "plotly", "ipywidgets", "ipysheet") if m in sys.modules),
+                  "env_started": project.GP_ENV is not None}))
+'''
+
+
+def test_import_is_lazy_and_fast():
+    output = subprocess.run([sys.executable, '-c', CODE], capture_output=True, text=True, check=True)
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+
+    assert result['heavy'] == []
+    assert not result['env_started']
+    assert result['seconds'] < IMPORT_BUDGET
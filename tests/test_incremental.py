@@ -0,0 +1,65 @@
+import copy
+import pathlib
+
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.demand import Demand
+from offgridoptimizer.registry import LOCATIONS
+from offgridoptimizer.series import HourlySeries
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+HOURS = list(range(2000, 2072))
+BUILDS = [('soc', 'matrix'), ('cumulative', 'expression')]
+
+
+@pytest.fixture
+def scaled_location():
+    base = LOCATIONS.get('asheville_nc')
+    LOCATIONS.profiles['scaled_test'] = base._replace(
+        location='scaled_test', demand=Demand(HourlySeries(base.demand.hourly_demand.array * 1.3)))
+    yield 'scaled_test'
+    LOCATIONS.profiles.pop('scaled_test')
+
+
+def solve(config, storage_formulation, build):
+    project = Project.project_from_config(config, hours=HOURS, validate=False,
+                                          storage_formulation=storage_formulation, build=build)
+    project.model.setParam('OutputFlag', 0)
+    project.optimize()
+    return project
+
+
+@pytest.mark.parametrize('storage_formulation, build', BUILDS)
+def test_edits_match_a_fresh_project(scaled_location, storage_formulation, build):
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    project = solve(config, storage_formulation, build)
+    project.model.update()
+    num_constrs = project.model.NumConstrs
+
+    edited = copy.deepcopy(config)
+    edited['location'] = scaled_location
+    project.set_demand_constraints(project.demand_array() * 1.3)
+    project.optimize()
+    assert project.model.NumConstrs == num_constrs
+    assert project.model.ObjVal == pytest.approx(solve(edited, storage_formulation, build).model.ObjVal)
+
+    edited['budget'] = {'initial': 30000, 'monthly': 400}
+    project.set_budget_constraints(30000, 400)
+    project.optimize()
+    assert project.model.ObjVal == pytest.approx(solve(edited, storage_formulation, build).model.ObjVal)
+
+    edited['products'][3]['incremental_cost'] = 1000
+    project.set_product_costs(project.products[3], incremental_cost=1000)
+    project.optimize()
+    assert project.model.ObjVal == pytest.approx(solve(edited, storage_formulation, build).model.ObjVal)
+
+
+def test_rebuild_removes_every_constraint():
+    project = solve(load_and_validate(CONFIGS / 'medium_budget.json'), 'soc', 'expression')
+    project.model.update()
+    num_constrs = project.model.NumConstrs
+
+    project.set_product_constraints(project.products)
+    project.model.update()
+    assert project.model.NumConstrs == num_constrs
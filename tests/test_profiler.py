@@ -0,0 +1,62 @@
+import pathlib
+
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.profiler import BuildProfiler
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+@pytest.mark.parametrize('storage_formulation, build', [('soc', 'matrix'), ('cumulative', 'expression')])
+def test_profile_accounts_for_the_whole_model(storage_formulation, build):
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    project = Project.project_from_config(config, hours=range(2000, 2048), validate=False, profile_build=True,
+                                          storage_formulation=storage_formulation, build=build)
+
+    rows = {row['phase']: row for row in project.profiler.rows()}
+    assert list(rows) == ['variables', 'grid', 'products', 'product_constraints', 'product_constraints.storage',
+                          'budget_constraints', 'demand_constraints', 'objective', 'total']
+    assert rows['total']['vars'] == project.model.NumVars
+    assert rows['total']['constrs'] == project.model.NumConstrs
+    assert rows['total']['nonzeros'] == project.model.NumNZs
+    assert rows['demand_constraints']['constrs'] == 48
+    # the storage loop is part of the product constraints, with the hourly storage constraints of every hour
+    assert 48 <= rows['product_constraints.storage']['constrs'] < rows['product_constraints']['constrs']
+    assert all(row['seconds'] >= 0 and row['alloc_mb'] is not None for row in rows.values())
+    assert 'product_constraints' in project.profiler.report()
+
+
+def test_no_profiler_by_default():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    assert Project.project_from_config(config, hours=range(2000, 2024), validate=False).profiler is None
+
+
+def test_nested_phase_keeps_the_parent_peak():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    project = Project.project_from_config(config, hours=range(2000, 2024), validate=False, profile_build=True)
+    profiler = BuildProfiler(project.model)
+    profiler.start()
+    with profiler.phase('outer'):
+        block = bytearray(8 * 2 ** 20)
+        del block
+        with profiler.phase('outer.inner'):
+            pass
+    with pytest.raises(RuntimeError):
+        with profiler.phase('failing'):
+            raise RuntimeError
+    profiler.stop()
+
+    rows = {row['phase']: row for row in profiler.rows()}
+    assert list(rows) == ['outer', 'outer.inner', 'total']
+    assert rows['outer']['peak_mb'] >= 8 > rows['outer.inner']['peak_mb']
+    assert rows['total']['peak_mb'] == rows['outer']['peak_mb']
+
+
+def test_edits_after_the_build_are_not_profiled():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    project = Project.project_from_config(config, hours=range(2000, 2024), validate=False, profile_build=True)
+    phases = [row['phase'] for row in project.profiler.rows()]
+    project.set_product_constraints(project.products)
+
+    assert [row['phase'] for row in project.profiler.rows()] == phases
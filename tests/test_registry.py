@@ -0,0 +1,24 @@
+import pytest
+
+from offgridoptimizer.registry import LocationRegistry
+
+
+def test_profiles_are_shared_and_counted():
+    registry = LocationRegistry(maxsize=1)
+
+    first = registry.get('Asheville,NC')
+    assert registry.get('asheville_nc') is first
+    assert registry.info() == {'hits': 1, 'misses': 1, 'size': 1, 'maxsize': 1}
+
+    registry.get('sedona_az')
+    assert registry.get('asheville_nc') is not first
+    assert registry.info()['misses'] == 3
+
+
+def test_profiles_are_read_only():
+    profile = LocationRegistry().get('asheville_nc')
+
+    with pytest.raises(ValueError):
+        profile.demand.hourly_demand.array[0] = 0
+    with pytest.raises(AttributeError):
+        profile.demand = None
@@ -0,0 +1,61 @@
+import pathlib
+
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.project import Sizing
+from offgridoptimizer.rolling import RollingHorizon, windows
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+
+# two small wind turbines and one battery, within the medium budget
+SIZING = Sizing(units=[0, 0, 2, 0, 1], opened=[0, 0, 1, 0, 1], grid_installed=1)
+BUILDS = [('soc', 'matrix'), ('soc', 'expression'), ('cumulative', 'expression')]
+
+
+def test_windows_cover_every_hour_once():
+    splits = windows(list(range(100)), window=48, overlap=12)
+
+    kept = [hour for window_hours, n in splits for hour in window_hours[:n]]
+    assert kept == list(range(100))
+    assert all(len(window_hours) <= 48 for window_hours, _ in splits)
+    with pytest.raises(ValueError):
+        windows(range(100), window=24, overlap=24)
+    with pytest.raises(ValueError):
+        windows([])
+
+
+@pytest.mark.parametrize('storage_formulation, build', BUILDS)
+def test_initial_storage_is_carried_in(storage_formulation, build):
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    project = Project.project_from_config(config, hours=range(2000, 2024), validate=False, initial_storage=5,
+                                          storage_formulation=storage_formulation, build=build)
+    project.fix_sizing(SIZING)
+    project.model.setParam('OutputFlag', 0)
+    project.optimize()
+
+    assert project.results_df().storage_level[0] == pytest.approx(5)
+    assert project.final_storage_level() >= 0
+
+
+@pytest.mark.parametrize('storage_formulation, build', BUILDS)
+def test_rolling_horizon_matches_fixed_sizing(storage_formulation, build):
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    hours = list(range(2000, 2000 + 24 * 7))
+    full = Project.project_from_config(config, hours=hours, validate=False,
+                                       storage_formulation=storage_formulation, build=build)
+    full.fix_sizing(SIZING)
+    full.model.setParam('OutputFlag', 0)
+    full.optimize()
+
+    rolling = RollingHorizon(config, SIZING, window=48, overlap=12, validate=False,
+                             storage_formulation=storage_formulation, build=build).solve(hours)
+    df = rolling.results_df()
+
+    assert df.hour.tolist() == hours
+    assert list(df.columns) == list(full.results_df().columns)
+    # before any window is solved the frame is empty with the same columns
+    assert list(RollingHorizon(config, SIZING).results_df().columns) == list(df.columns)
+    assert df.storage_level.max() > 0
+    assert dict(rolling.costs())['Total Cost'] >= dict(full.costs())['Total Cost'] - 1e-6
+    assert dict(rolling.costs())['Total Cost'] == pytest.approx(dict(full.costs())['Total Cost'], rel=1e-3)
@@ -0,0 +1,74 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from offgridoptimizer import hour_of_year
+from offgridoptimizer.series import HourlySeries, load_series, hours_of_year, CACHE_DIR_ENV
+
+DEMAND_CSV = 'local_time,demand\n01-01-2019 00:00,1.5\n01-01-2019 01:00,2.5\n01-01-2019 03:00,3.5\n'
+
+
+@pytest.fixture
+def demand_csv(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / 'cache'))
+    path = tmp_path / 'demand_test.csv'
+    path.write_text(DEMAND_CSV)
+    return path
+
+
+def test_series_behaves_like_dict(demand_csv):
+    series = load_series(demand_csv, column='demand', fmt='%m-%d-%Y %H:%M')
+
+    assert dict(series) == {0: 1.5, 1: 2.5, 3: 3.5}
+    assert 2 not in series
+    with pytest.raises(KeyError):
+        series[2]
+    assert series.take([3, 0]).tolist() == [3.5, 1.5]
+    with pytest.raises(KeyError):
+        series.take([1, 2])
+    with pytest.raises(KeyError):
+        series.take([0, -1])
+
+
+def test_cache_is_memory_mapped(demand_csv):
+    load_series(demand_csv, column='demand', fmt='%m-%d-%Y %H:%M')
+    series = load_series(demand_csv, column='demand', fmt='%m-%d-%Y %H:%M')
+
+    assert isinstance(series.array, np.memmap)
+
+
+def test_cache_invalidated_by_content(demand_csv):
+    load_series(demand_csv, column='demand', fmt='%m-%d-%Y %H:%M')
+
+    # same contents with a new modification time keeps the cache entry
+    os.utime(demand_csv, ns=(0, 0))
+    assert load_series(demand_csv, column='demand', fmt='%m-%d-%Y %H:%M')[0] == 1.5
+
+    demand_csv.write_text(DEMAND_CSV.replace('1.5', '9.5'))
+    assert load_series(demand_csv, column='demand', fmt='%m-%d-%Y %H:%M')[0] == 9.5
+
+
+def test_from_dict_marks_missing_hours():
+    series = HourlySeries.from_dict({0: 1.0, 5: 2.0})
+
+    assert len(series) == 2
+    assert list(series) == [0, 5]
+    assert series.scale(2)[5] == 4.0
+
+
+@pytest.mark.parametrize('fmt', ["%Y-%m-%d %H:%M", "%m-%d-%Y %H:%M"])
+@pytest.mark.parametrize('year', [2019, 2020])
+def test_hours_of_year_matches_strptime(fmt, year):
+    times = [datetime(year, 1, 1, 0), datetime(year, 2, 28, 23), datetime(year, 3, 1, 5, 30),
+             datetime(year, 11, 3, 1), datetime(year, 12, 31, 23, 59)]
+    timestamps = np.array([t.strftime(fmt) for t in times], dtype='S16')
+
+    assert hours_of_year(timestamps, fmt).tolist() == [hour_of_year(t) for t in times]
+
+
+def test_repeated_hours_keep_last_value():
+    series = HourlySeries.from_hours(np.array([0, 1, 1, 2]), np.array([1.0, 2.0, 3.0, 4.0]))
+
+    assert dict(series) == {0: 1.0, 1: 3.0, 2: 4.0}
@@ -0,0 +1,31 @@
+import pathlib
+
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+@pytest.mark.parametrize('storage_formulation, build', [('soc', 'matrix'), ('soc', 'expression')])
+def test_solution_matches_variable_values(storage_formulation, build):
+    config = load_and_validate(CONFIGS / 'high_budget.json')
+    project = Project.project_from_config(config, hours=range(2000, 2100), validate=False, initial_storage=2,
+                                          storage_formulation=storage_formulation, build=build)
+    project.model.setParam('OutputFlag', 0)
+    project.optimize()
+
+    df = project.results_df()
+    assert df.hour.tolist() == list(range(2000, 2100))
+    assert df.storage_level.tolist() == pytest.approx([2] + [project.storage_level(hour, True)
+                                                             for hour in range(2000, 2099)], abs=1e-6)
+    assert df.capacity.tolist() == pytest.approx([project.electricity_capacity(hour, True)
+                                                  for hour in range(2000, 2100)])
+
+    costs = dict(project.costs())
+    assert costs['Total Opening Cost'] == pytest.approx(project.total_opening_cost(concretize=True))
+    assert costs['Total Grid Cost'] == pytest.approx(project.grid.actual_total_grid_cost(concretize=True))
+    assert costs['Total Revenue'] == pytest.approx(project.total_revenue(concretize=True))
+    assert costs['Total Cost'] == pytest.approx(project.model.ObjVal -
+                                                project.grid.artificial_total_grid_cost(concretize=True) +
+                                                costs['Total Grid Cost'])
@@ -0,0 +1,78 @@
+import pathlib
+
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.product import StorageProduct
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+def solve(config_name, hours, storage_formulation, build=Project.EXPRESSION_BUILD):
+    config = load_and_validate(CONFIGS / f'{config_name}.json')
+    project = Project.project_from_config(config, hours=hours, validate=False,
+                                          storage_formulation=storage_formulation, build=build)
+    project.model.setParam('OutputFlag', 0)
+    project.optimize()
+    return project
+
+
+@pytest.mark.parametrize('config_name', ['low_budget', 'high_budget'])
+@pytest.mark.parametrize('first_hour', [0, 4000])
+def test_state_of_charge_matches_cumulative(config_name, first_hour):
+    hours = list(range(first_hour, first_hour + 48))
+    cumulative = solve(config_name, hours, StorageProduct.CUMULATIVE)
+    soc = solve(config_name, hours, StorageProduct.STATE_OF_CHARGE)
+
+    assert soc.model.ObjVal == pytest.approx(cumulative.model.ObjVal, rel=1e-6)
+    assert soc.model.NumNZs < cumulative.model.NumNZs
+
+
+@pytest.mark.parametrize('first_hour', [0, 4000])
+def test_matrix_build_matches_expression_build(first_hour):
+    hours = list(range(first_hour, first_hour + 48))
+    expression = solve('medium_budget', hours, StorageProduct.STATE_OF_CHARGE)
+    matrix = solve('medium_budget', hours, StorageProduct.STATE_OF_CHARGE, build=Project.MATRIX_BUILD)
+
+    assert matrix.model.NumNZs == expression.model.NumNZs
+    assert matrix.model.ObjVal == pytest.approx(expression.model.ObjVal, rel=1e-6)
+    assert dict(matrix.costs()) == pytest.approx(dict(expression.costs()), rel=1e-6, abs=1e-6)
+    assert dict(matrix.selected_products()) == pytest.approx(dict(expression.selected_products()))
+
+
+def test_matrix_build_requires_state_of_charge():
+    config = load_and_validate(CONFIGS / 'low_budget.json')
+    with pytest.raises(ValueError):
+        Project.project_from_config(config, hours=[0], validate=False, build=Project.MATRIX_BUILD)
+
+
+def test_state_of_charge_is_linear_in_hours():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    nonzeros = []
+    for horizon in [24, 48, 96]:
+        project = Project.project_from_config(config, hours=list(range(1, horizon + 1)), validate=False,
+                                              storage_formulation=StorageProduct.STATE_OF_CHARGE)
+        project.model.update()
+        nonzeros.append(project.model.NumNZs)
+
+    assert nonzeros[2] - nonzeros[1] == 2 * (nonzeros[1] - nonzeros[0])
+
+
+def test_unknown_formulation():
+    config = load_and_validate(CONFIGS / 'low_budget.json')
+    with pytest.raises(ValueError):
+        Project.project_from_config(config, hours=[0], validate=False, storage_formulation='bogus')
+
+
+def test_hourly_expressions_are_built_once_per_model_version():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    project = Project.project_from_config(config, hours=list(range(24)), validate=False,
+                                          storage_formulation=StorageProduct.STATE_OF_CHARGE)
+
+    assert project.electricity_capacity(5) is project.electricity_capacity(5)
+    assert project.storage_consumed(5) is project.storage_consumed(5)
+
+    stale = project.electricity_capacity(5)
+    project.set_product_constraints(project.products)
+    assert project.model_version == 1
+    assert project.electricity_capacity(5) is not stale
@@ -0,0 +1,54 @@
+import pathlib
+
+import pandas as pd
+import pytest
+
+from offgridoptimizer import load_and_validate
+from offgridoptimizer.sweep import main, scenarios, sweep, write_table, parse_axis
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+def test_scenarios_cover_every_combination():
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    jobs = scenarios(config, {'location': ['asheville_nc', 'sedona_az'], 'budget.initial': [1, 2, 3],
+                              'products': {'none': [], 'same': config['products']}})
+
+    assert len(jobs) == 12
+    labels, edited = jobs[-1]
+    assert labels == {'location': 'sedona_az', 'budget.initial': 3, 'products': 'same'}
+    assert edited['budget']['initial'] == 3 and edited['location'] == 'sedona_az'
+    assert config['budget']['initial'] == 40000
+    assert parse_axis('allow_grid=true,false') == ('allow_grid', [True, False])
+
+
+def test_sweep_writes_one_row_per_scenario(tmp_path):
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    df = sweep(config, {'location': ['asheville_nc', 'sedona_az'], 'budget.initial': [20000, 40000]},
+               hours=range(2000, 2024), processes=0, storage_formulation='soc', build='matrix')
+
+    assert len(df) == 4
+    assert (df.status == 2).all()
+    assert {'location', 'budget.initial', 'objective', 'Total Cost', 'units_battery'} <= set(df.columns)
+
+    write_table(df, tmp_path / 'sweep.csv')
+    assert len(pd.read_csv(tmp_path / 'sweep.csv')) == 4
+
+
+def test_sweep_rounds_the_relaxation():
+    config = load_and_validate(CONFIGS / 'low_budget.json')
+    df = sweep(config, {'budget.initial': [20000, 40000]}, hours=range(2000, 2024), processes=0, relax=True,
+               storage_formulation='soc', build='matrix')
+
+    assert (df.status == 2).all()
+    assert (df.lower_bound <= df.objective).all() and df.gap.between(0, 1).all()
+
+
+def test_sweep_cli_builds_the_cumulative_formulation_by_expression(tmp_path):
+    output = tmp_path / 'sweep.csv'
+    main([str(CONFIGS / 'low_budget.json'), '--axis', 'budget.initial=20000', '--hours', 'first_week',
+          '--formulation', 'cumulative', '--processes', '0', '--output', str(output)])
+
+    assert (pd.read_csv(output).status == 2).all()
+    with pytest.raises(SystemExit):
+        main([str(CONFIGS / 'low_budget.json'), '--formulation', 'cumulative', '--build', 'matrix'])
@@ -0,0 +1,37 @@
+import json
+import pathlib
+
+import gurobipy as gp
+import pytest
+
+from offgridoptimizer import Project, load_and_validate
+from offgridoptimizer.telemetry import SolveTelemetry
+
+CONFIGS = pathlib.Path(__file__).parent.parent / 'configs'
+
+
+def test_telemetry_records_progress_and_final_statistics(tmp_path):
+    config = load_and_validate(CONFIGS / 'medium_budget.json')
+    project = Project.project_from_config(config, hours=range(2000, 2168), validate=False,
+                                          storage_formulation='soc', build='matrix')
+    project.model.setParam('OutputFlag', 0)
+    calls = []
+    telemetry = SolveTelemetry(labels={'config': 'medium_budget'})
+    project.optimize(callback=lambda model, where: calls.append(where), telemetry=telemetry)
+
+    assert calls  # the caller's own callback still runs
+    final = telemetry.events[-1]
+    assert final['event'] == 'final' and final['Status'] == gp.GRB.OPTIMAL
+    assert final['NumVars'] == project.model.NumVars and final['NumNZs'] == project.model.NumNZs
+    assert 'rows_removed' in final['presolve']
+
+    incumbents = [event for event in telemetry.events if event['event'] == 'incumbent']
+    assert incumbents and incumbents[-1]['incumbent'] == pytest.approx(project.model.ObjVal)
+
+    telemetry.write(tmp_path / 'solve.jsonl')
+    lines = (tmp_path / 'solve.jsonl').read_text().splitlines()
+    assert [json.loads(line)['event'] for line in lines][-1] == 'final'
+
+    telemetry.write(tmp_path / 'solve.prom')
+    assert f'offgrid_model_vars{{config="medium_budget"}} {float(project.model.NumVars)!r}' in \
+        (tmp_path / 'solve.prom').read_text()
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+import numpy as np
+
+from offgridoptimizer import hour_of_year, HOURS_IN_YEAR
+from offgridoptimizer.registry import location_profile
+from offgridoptimizer.timeindex import align, hours_each_month, one_day_each_month, everyday_one_month, MONTH, DAY
+
+
+def test_calendar_matches_datetime():
+    for month in range(1, 13):
+        start = hour_of_year(datetime(2019, month, 1))
+        assert MONTH[start] == month
+        assert DAY[start] == 1
+        assert MONTH[start - 1] == (month - 2) % 12 + 1
+
+
+def test_hour_selections():
+    assert len(hours_each_month(range(1, 13))) == HOURS_IN_YEAR
+    assert hours_each_month([2])[0] == hour_of_year(datetime(2019, 2, 1))
+    assert len(everyday_one_month(2)) == 28 * 24
+    assert len(one_day_each_month()) == 12 * 24
+
+
+def test_align_fills_gaps_and_drops_leap_day():
+    array = np.arange(HOURS_IN_YEAR, dtype=float)
+    array[[10, 11, HOURS_IN_YEAR - 1]] = np.nan
+    aligned = align(array)
+
+    assert aligned[10] == 10 and aligned[11] == 11
+    assert aligned[-1] == HOURS_IN_YEAR - 2
+
+    leap_year = np.concatenate([np.zeros(59 * 24), np.ones(24), np.full(HOURS_IN_YEAR - 59 * 24, 2.0)])
+    assert (align(leap_year) != 1).all()
+    assert len(align(leap_year)) == HOURS_IN_YEAR
+
+
+def test_location_profiles_are_gap_free():
+    profile = location_profile('asheville_nc')
+    for series in [profile.demand.hourly_demand, profile.hourly_grid,
+                   profile.efficiency.hourly_solar_capacity, profile.efficiency.hourly_wind_capacity]:
+        assert len(series) == HOURS_IN_YEAR